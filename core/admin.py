@@ -1,9 +1,125 @@
-from django.contrib import admin
+import re
+from datetime import timedelta
 
-from core.models import PhoneNumber
+from django.contrib import admin, messages
+from django.contrib.auth import get_permission_codename
+from django.utils import timezone
+
+from core.models import BalanceAlert, PhoneNumber, Seller, TopUpRequest, Transaction
+from core.pagination import EstimatedCountPaginator
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Defaults for tables too big for COUNT(*) and unbounded FK dropdowns."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+
+class RecentCreatedFilter(admin.SimpleListFilter):
+    """Bounded created_at ranges, so partition pruning and (x, created_at) indexes apply."""
+
+    title = "created"
+    parameter_name = "created"
+    ranges = {"1d": ("Last 24 hours", 1), "7d": ("Last 7 days", 7), "30d": ("Last 30 days", 30)}
+
+    def lookups(self, request, model_admin):
+        return [(key, label) for key, (label, _) in self.ranges.items()]
+
+    def queryset(self, request, queryset):
+        if self.value() not in self.ranges:
+            return queryset
+        days = self.ranges[self.value()][1]
+        return queryset.filter(created_at__gte=timezone.now() - timedelta(days=days))
+
+
+@admin.register(Seller)
+class SellerAdmin(LargeTableAdmin):
+    list_display = ["id", "name", "balance", "low_balance_threshold", "version", "created_at"]
+    search_fields = ["name"]
+    ordering = ["id"]
+    readonly_fields = ["balance", "version", "low_balance_alerted", "low_balance_alerted_at"]
 
 
-# Register your models here.
 @admin.register(PhoneNumber)
-class PhoneNumberAdmin(admin.ModelAdmin):
-    list_display = ["name", "number", "created_at"]
\ No newline at end of file
+class PhoneNumberAdmin(LargeTableAdmin):
+    list_display = ["name", "number", "created_at"]
+    search_fields = ["^number"]
+    ordering = ["id"]
+
+
+@admin.register(Transaction)
+class TransactionAdmin(LargeTableAdmin):
+    list_display = ["id", "seller", "tx_type", "amount", "balance_after", "phone", "reference", "created_at"]
+    list_select_related = ["seller", "phone"]
+    list_filter = [RecentCreatedFilter, "tx_type"]
+    # Exact matches only; see get_search_results.
+    search_fields = ["=reference", "=phone__number"]
+    phone_number_pattern = re.compile(r"^\+?\d{6,15}$")
+    raw_id_fields = ["seller", "phone"]
+    # id leads the primary key index; created_at has no index of its own.
+    ordering = ["-id"]
+
+    def get_search_results(self, request, queryset, search_term):
+        """Match either the phone number or the reference, never both.
+
+        The default ORs the search fields over a LEFT JOIN, which neither
+        index can serve, so every search scanned all partitions.
+        """
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        if self.phone_number_pattern.match(term):
+            return queryset.filter(phone__number=term), False
+        return queryset.filter(reference=term), False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(TopUpRequest)
+class TopUpRequestAdmin(LargeTableAdmin):
+    list_display = ["id", "seller", "amount", "approved", "applied_at", "approved_by", "created_at"]
+    list_select_related = ["seller"]
+    list_filter = ["approved", ("applied_at", admin.EmptyFieldListFilter)]
+    search_fields = ["=idempotency_key"]
+    autocomplete_fields = ["seller"]
+    readonly_fields = ["approved", "applied_at", "approved_by"]
+    ordering = ["-id"]
+    actions = ["apply_selected"]
+
+    def get_readonly_fields(self, request, obj=None):
+        fields = super().get_readonly_fields(request, obj)
+        if obj is not None and obj.applied_at:
+            # Already credited: the request must keep matching its ledger row.
+            return [*fields, "seller", "amount"]
+        return fields
+
+    def has_approve_permission(self, request):
+        codename = get_permission_codename("approve", self.opts)
+        return request.user.has_perm(f"{self.opts.app_label}.{codename}")
+
+    @admin.action(description="Approve and apply selected top-ups", permissions=["approve"])
+    def apply_selected(self, request, queryset):
+        pks = list(queryset.values_list("pk", flat=True))
+        applied = TopUpRequest.apply_bulk(pks, approver=request.user.get_username())
+        skipped = len(pks) - applied
+        self.message_user(request, f"Applied {applied} top-up(s).", messages.SUCCESS)
+        if skipped:
+            self.message_user(request, f"Skipped {skipped} already applied.", messages.WARNING)
+
+
+@admin.register(BalanceAlert)
+class BalanceAlertAdmin(LargeTableAdmin):
+    list_display = ["id", "seller", "balance", "threshold", "created_at", "delivered_at"]
+    list_select_related = ["seller"]
+    list_filter = [("delivered_at", admin.EmptyFieldListFilter)]
+    raw_id_fields = ["seller"]
+    ordering = ["-id"]
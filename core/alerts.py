@@ -0,0 +1,39 @@
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import BalanceAlert
+
+logger = logging.getLogger(__name__)
+
+
+def log_alerts(alerts):
+    """Default BALANCE_ALERT_BACKEND: write each alert to the log."""
+    for alert in alerts:
+        logger.warning(
+            "Low balance: seller=%s balance=%s threshold=%s",
+            alert.seller_id, alert.balance, alert.threshold,
+        )
+
+
+def deliver_pending(batch_size=500):
+    """Hand one batch of undelivered alerts to the backend and mark them delivered.
+
+    Rows are claimed with SKIP LOCKED so several workers can drain the queue
+    concurrently. If the backend raises, the batch stays pending.
+    """
+    backend = import_string(getattr(settings, "BALANCE_ALERT_BACKEND", "core.alerts.log_alerts"))
+    with transaction.atomic():
+        alerts = list(
+            BalanceAlert.objects.select_for_update(skip_locked=True)
+            .filter(delivered_at__isnull=True)
+            .order_by("id")[:batch_size]
+        )
+        if not alerts:
+            return 0
+        backend(alerts)
+        BalanceAlert.objects.filter(pk__in=[alert.pk for alert in alerts]).update(delivered_at=timezone.now())
+    return len(alerts)
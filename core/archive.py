@@ -0,0 +1,223 @@
+import csv
+import gzip
+import hashlib
+import json
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from . import partitions
+from .models import TransactionReference
+
+ARCHIVE_COLUMNS = [
+    "id",
+    "seller_id",
+    "tx_type",
+    "amount",
+    "balance_after",
+    "phone_id",
+    "reference",
+    "metadata",
+    "created_at",
+]
+FETCH_SIZE = 5000
+
+
+class ArchiveIntegrityError(Exception):
+    pass
+
+
+def archive_dir():
+    return Path(getattr(settings, "TRANSACTION_ARCHIVE_DIR", Path(settings.BASE_DIR) / "archive"))
+
+
+def _encode(row):
+    values = dict(zip(ARCHIVE_COLUMNS, row))
+    metadata = values["metadata"]
+    if metadata is not None and not isinstance(metadata, str):
+        metadata = json.dumps(metadata, sort_keys=True)
+    return [
+        values["id"],
+        values["seller_id"],
+        values["tx_type"],
+        values["amount"],
+        values["balance_after"],
+        "" if values["phone_id"] is None else values["phone_id"],
+        "" if values["reference"] is None else values["reference"],
+        "" if metadata is None else metadata,
+        values["created_at"].isoformat(),
+    ]
+
+
+def _decode(record):
+    return {
+        "id": int(record["id"]),
+        "seller_id": int(record["seller_id"]),
+        "tx_type": record["tx_type"],
+        "amount": Decimal(record["amount"]),
+        "balance_after": Decimal(record["balance_after"]),
+        "phone_id": int(record["phone_id"]) if record["phone_id"] else None,
+        "reference": record["reference"] or None,
+        "metadata": json.loads(record["metadata"]) if record["metadata"] else None,
+        "created_at": datetime.fromisoformat(record["created_at"]),
+    }
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_archive(directory, name, rows, period_start, period_end):
+    """Write ``rows`` (tuples in ARCHIVE_COLUMNS order) to ``<name>.csv.gz`` plus a manifest."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    data_path = directory / f"{name}.csv.gz"
+    manifest_path = directory / f"{name}.manifest.json"
+
+    row_count = 0
+    with gzip.open(data_path, "wt", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(ARCHIVE_COLUMNS)
+        for row in rows:
+            writer.writerow(_encode(row))
+            row_count += 1
+
+    manifest = {
+        "table": name,
+        "file": data_path.name,
+        "columns": ARCHIVE_COLUMNS,
+        "period_start": period_start.isoformat(),
+        "period_end": period_end.isoformat(),
+        "row_count": row_count,
+        "sha256": _sha256(data_path),
+    }
+    with open(manifest_path, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2)
+    return manifest
+
+
+def _stream_table(name):
+    """Yield the table's rows in id order through a server-side cursor, FETCH_SIZE at a time."""
+    columns = ", ".join(f'"{column}"' for column in ARCHIVE_COLUMNS)
+    with connection.chunked_cursor() as cursor:
+        cursor.itersize = FETCH_SIZE
+        cursor.execute(f'SELECT {columns} FROM "{name}" ORDER BY "id"')
+        while True:
+            batch = cursor.fetchmany(FETCH_SIZE)
+            if not batch:
+                break
+            yield from batch
+
+
+def _count_table(name):
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT COUNT(*) FROM "{name}"')
+        return cursor.fetchone()[0]
+
+
+def archive_partition(name, period_start, directory=None, drop=True):
+    """Write a monthly partition to a compressed archive, then detach and drop it.
+
+    Everything runs in one transaction: the partition stays attached (and
+    locked against writes) while the archive is written and verified, and is
+    only detached and dropped, together with its reference claims, once the
+    archive is known good. A failure or a crash at any point leaves the
+    partition in the ledger.
+    """
+    directory = directory or archive_dir()
+    period_end = partitions.add_months(period_start, 1)
+
+    manifest_path = Path(directory) / f"{name}.manifest.json"
+    try:
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(f'LOCK TABLE "{name}" IN SHARE MODE')
+            expected = _count_table(name)
+            manifest = write_archive(directory, name, _stream_table(name), period_start, period_end)
+            if manifest["row_count"] != expected:
+                raise ArchiveIntegrityError(
+                    f"{name}: wrote {manifest['row_count']} rows, table has {expected}"
+                )
+            verify_archive(manifest_path)
+
+            # Archived references leave the idempotency window with their month.
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'DELETE FROM "{TransactionReference._meta.db_table}" claim USING "{name}" tx '
+                    f"WHERE claim.reference = tx.reference AND claim.transaction_id = tx.id"
+                )
+            partitions.detach_partition(name)
+            if drop:
+                partitions.drop_table(name)
+    except Exception:
+        # The rows are still live; a leftover archive would make readers see them twice.
+        manifest_path.unlink(missing_ok=True)
+        (Path(directory) / f"{name}.csv.gz").unlink(missing_ok=True)
+        raise
+    return manifest
+
+
+def load_manifests(directory=None):
+    directory = Path(directory or archive_dir())
+    if not directory.exists():
+        return []
+    manifests = []
+    for path in sorted(directory.glob("*.manifest.json")):
+        with open(path, encoding="utf-8") as fh:
+            manifest = json.load(fh)
+        manifest["path"] = str(path)
+        manifests.append(manifest)
+    return manifests
+
+
+def verify_archive(manifest_path):
+    """Check an archive file against the checksum and row count in its manifest."""
+    manifest_path = Path(manifest_path)
+    with open(manifest_path, encoding="utf-8") as fh:
+        manifest = json.load(fh)
+    data_path = manifest_path.parent / manifest["file"]
+
+    if _sha256(data_path) != manifest["sha256"]:
+        raise ArchiveIntegrityError(f"Checksum mismatch for {data_path.name}")
+    with gzip.open(data_path, "rt", newline="", encoding="utf-8") as fh:
+        rows = sum(1 for _ in csv.reader(fh)) - 1
+    if rows != manifest["row_count"]:
+        raise ArchiveIntegrityError(
+            f"Row count mismatch for {data_path.name}: {rows} != {manifest['row_count']}"
+        )
+    return manifest
+
+
+def iter_archived_transactions(start=None, end=None, seller_id=None, directory=None, verify=True):
+    """Yield archived transactions as dicts, optionally limited to ``[start, end)`` and a seller.
+
+    Only the archive files whose period overlaps the requested range are opened.
+    """
+    for manifest in load_manifests(directory):
+        period_start = datetime.fromisoformat(manifest["period_start"])
+        period_end = datetime.fromisoformat(manifest["period_end"])
+        if start is not None and period_end <= start:
+            continue
+        if end is not None and period_start >= end:
+            continue
+        if verify:
+            verify_archive(manifest["path"])
+
+        data_path = Path(manifest["path"]).parent / manifest["file"]
+        with gzip.open(data_path, "rt", newline="", encoding="utf-8") as fh:
+            for record in csv.DictReader(fh):
+                tx = _decode(record)
+                if seller_id is not None and tx["seller_id"] != seller_id:
+                    continue
+                if start is not None and tx["created_at"] < start:
+                    continue
+                if end is not None and tx["created_at"] >= end:
+                    continue
+                yield tx
@@ -0,0 +1,91 @@
+import logging
+import random
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db import InterfaceError, OperationalError, connection
+
+logger = logging.getLogger(__name__)
+
+DEADLOCK = "deadlock"
+SERIALIZATION = "serialization"
+LOCK_TIMEOUT = "lock_timeout"
+STATEMENT_TIMEOUT = "statement_timeout"
+CONNECTION = "connection"
+PERMANENT = "permanent"
+TRANSIENT = {DEADLOCK, SERIALIZATION, LOCK_TIMEOUT, STATEMENT_TIMEOUT, CONNECTION}
+
+# SQLSTATE codes; 55P03 is raised both by lock_timeout and by NOWAIT.
+SQLSTATES = {
+    "40P01": DEADLOCK,
+    "40001": SERIALIZATION,
+    "55P03": LOCK_TIMEOUT,
+    "57014": STATEMENT_TIMEOUT,
+}
+
+_counts_lock = threading.Lock()
+_counts = Counter()
+
+
+def lock_options(lock_timeout_ms=None, nowait=None):
+    """Resolve per-call lock options against LOCK_TIMEOUT_MS / LOCK_NOWAIT."""
+    if lock_timeout_ms is None:
+        lock_timeout_ms = getattr(settings, "LOCK_TIMEOUT_MS", None)
+    if nowait is None:
+        nowait = getattr(settings, "LOCK_NOWAIT", False)
+    return lock_timeout_ms, nowait
+
+
+def set_lock_timeout(lock_timeout_ms):
+    """Limit how long row locks are waited for in the current transaction (PostgreSQL)."""
+    if not lock_timeout_ms or connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT set_config('lock_timeout', %s, true)", [f"{int(lock_timeout_ms)}ms"])
+
+
+def _sqlstate(exc):
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        code = getattr(exc, "pgcode", None) or getattr(exc, "sqlstate", None)
+        if code:
+            return code
+        exc = exc.__cause__ or exc.__context__
+    return None
+
+
+def classify(exc):
+    """Return the failure class of ``exc``; everything not in TRANSIENT should not be retried."""
+    code = _sqlstate(exc)
+    if code in SQLSTATES:
+        return SQLSTATES[code]
+    if code is None and isinstance(exc, (OperationalError, InterfaceError)):
+        return CONNECTION
+    return PERMANENT
+
+
+def is_transient(exc):
+    return classify(exc) in TRANSIENT
+
+
+def record(kind, where):
+    with _counts_lock:
+        _counts[kind] += 1
+    logger.warning("%s failure in %s", kind, where)
+
+
+def stats():
+    """Failure counts of this process only; every web and Celery worker keeps its own."""
+    with _counts_lock:
+        return dict(_counts)
+
+
+def backoff_delay(attempt, base=None, cap=None):
+    """Exponential backoff with full jitter: uniform(0, min(cap, base * 2**attempt)) seconds."""
+    if base is None:
+        base = getattr(settings, "CONTENTION_BACKOFF_BASE", 0.5)
+    if cap is None:
+        cap = getattr(settings, "CONTENTION_BACKOFF_CAP", 30)
+    return random.uniform(0, min(cap, base * 2 ** attempt))
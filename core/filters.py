@@ -0,0 +1,37 @@
+import django_filters
+from rest_framework.exceptions import ValidationError
+
+from .models import Transaction
+
+
+class TransactionSearchFilter(django_filters.FilterSet):
+    """Filters for the transaction search endpoint.
+
+    Every filter maps onto an index: ``phone`` + date range onto
+    ``(phone, created_at)``, ``seller`` + date range onto ``(seller, created_at)``
+    and ``metadata`` onto the GIN index via JSON containment.
+    """
+
+    phone = django_filters.CharFilter(field_name="phone__number")
+    phone_prefix = django_filters.CharFilter(field_name="phone__number", lookup_expr="startswith")
+    created_after = django_filters.IsoDateTimeFilter(field_name="created_at", lookup_expr="gte")
+    created_before = django_filters.IsoDateTimeFilter(field_name="created_at", lookup_expr="lt")
+    # Bounds are signed ledger amounts: sales are stored negative, so sales of
+    # 10,000 to 50,000 are amount_min=-50000&amount_max=-10000.
+    amount_min = django_filters.NumberFilter(field_name="amount", lookup_expr="gte")
+    amount_max = django_filters.NumberFilter(field_name="amount", lookup_expr="lte")
+    metadata = django_filters.CharFilter(method="filter_metadata")
+
+    class Meta:
+        model = Transaction
+        fields = ["seller", "tx_type"]
+
+    def filter_metadata(self, queryset, name, value):
+        """Filter on ``key:value`` pairs; repeat the parameter to require several keys."""
+        pairs = {}
+        for item in self.request.query_params.getlist(name) if self.request else [value]:
+            key, sep, val = item.partition(":")
+            if not sep or not key:
+                raise ValidationError({name: "Expected key:value"})
+            pairs[key] = val
+        return queryset.filter(metadata__contains=pairs)
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core import archive, partitions
+
+
+class Command(BaseCommand):
+    help = "Detach old core_transaction partitions and write them to compressed archive files."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep-months",
+            type=int,
+            default=getattr(settings, "TRANSACTION_ARCHIVE_KEEP_MONTHS", 12),
+            help="Number of most recent months (including the current one) to keep online.",
+        )
+        parser.add_argument("--directory", default=None, help="Archive directory (defaults to TRANSACTION_ARCHIVE_DIR).")
+        parser.add_argument("--keep-table", action="store_true", help="Leave the detached table in place instead of dropping it.")
+        parser.add_argument("--dry-run", action="store_true", help="Only list the partitions that would be archived.")
+
+    def handle(self, *args, **options):
+        if not partitions.is_partitioned():
+            raise CommandError("core_transaction is not a partitioned table (PostgreSQL only).")
+        if options["keep_months"] < 1:
+            raise CommandError("--keep-months must be at least 1")
+
+        cutoff = partitions.add_months(partitions.month_start(timezone.now()), -(options["keep_months"] - 1))
+        candidates = [(name, start) for name, start in partitions.list_partitions() if start < cutoff]
+        if not candidates:
+            self.stdout.write("Nothing to archive.")
+            return
+
+        for name, start in candidates:
+            if options["dry_run"]:
+                self.stdout.write(f"would archive {name}")
+                continue
+            manifest = archive.archive_partition(
+                name, start, directory=options["directory"], drop=not options["keep_table"]
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f"archived {name}: {manifest['row_count']} rows, sha256={manifest['sha256']}"
+            ))
@@ -0,0 +1,41 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+
+from core import feed
+from core.serializers import ChangeEventSerializer
+
+
+class Command(BaseCommand):
+    help = "Stream ledger change events as JSON lines, storing the consumer's offset after every batch."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--consumer", required=True, help="Name under which the offset is stored.")
+        parser.add_argument("--batch", type=int, default=500)
+        parser.add_argument("--wait", type=float, default=30, help="Long-poll timeout in seconds.")
+        parser.add_argument("--output", default="-", help="File to append to, or - for stdout.")
+        parser.add_argument("--once", action="store_true", help="Exit once the feed is drained.")
+
+    def handle(self, *args, **options):
+        out = sys.stdout if options["output"] == "-" else open(options["output"], "a", encoding="utf-8")
+        cursor = feed.consumer_cursor(options["consumer"])
+        try:
+            while True:
+                events = feed.long_poll(cursor, limit=options["batch"], wait=0 if options["once"] else options["wait"])
+                if not events:
+                    if options["once"]:
+                        break
+                    continue
+                for event in ChangeEventSerializer(events, many=True).data:
+                    out.write(json.dumps(event, cls=DjangoJSONEncoder) + "\n")
+                out.flush()
+                # Ack only after the batch is written: delivery is at-least-once.
+                cursor = feed.ack(options["consumer"], (events[-1].txid, events[-1].pk))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        self.stderr.write(f"{options['consumer']} at {feed.format_cursor(cursor)}")
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core import partitions
+
+
+class Command(BaseCommand):
+    help = "Pre-create monthly core_transaction partitions for the coming months."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=getattr(settings, "TRANSACTION_PARTITION_MONTHS_AHEAD", 3),
+            help="How many months after the current one to create partitions for.",
+        )
+
+    def handle(self, *args, **options):
+        if not partitions.is_partitioned():
+            raise CommandError("core_transaction is not a partitioned table (PostgreSQL only).")
+
+        start = partitions.month_start(timezone.now())
+        end = partitions.add_months(start, options["months_ahead"])
+        ensured, failed = partitions.ensure_partitions(start, end)
+        for name in ensured:
+            self.stdout.write(f"ensured {name}")
+        for name, exc in failed.items():
+            self.stderr.write(f"failed {name}: {exc}")
+        if failed:
+            raise CommandError(f"{len(failed)} partition(s) could not be created; the others were.")
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core import partitions
+from core.statements import ArchivedPeriodError, check_not_archived, parse_period, run_statements
+
+
+class Command(BaseCommand):
+    help = "Generate monthly per-seller statements in parallel. Re-running resumes an interrupted job."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--period", default=None, help="Month as YYYY-MM (default: previous month).")
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument("--chunk", type=int, default=100, help="Sellers per work unit.")
+        parser.add_argument("--directory", default=None, help="Output directory (defaults to STATEMENTS_DIR).")
+
+    def handle(self, *args, **options):
+        period = options["period"]
+        if period is None:
+            previous = partitions.add_months(partitions.month_start(timezone.now()), -1)
+            period = f"{previous.year:04d}-{previous.month:02d}"
+        try:
+            parse_period(period)
+        except ValueError:
+            raise CommandError("--period must look like YYYY-MM")
+        if options["workers"] < 1 or options["chunk"] < 1:
+            raise CommandError("--workers and --chunk must be positive")
+        try:
+            check_not_archived(period)
+        except ArchivedPeriodError as exc:
+            raise CommandError(str(exc))
+
+        done = [0]
+
+        def progress(entries):
+            done[0] += len(entries)
+            self.stdout.write(f"{done[0]} statements written")
+
+        manifest = run_statements(
+            period,
+            workers=options["workers"],
+            chunk_size=options["chunk"],
+            directory=options["directory"],
+            progress=progress,
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{period}: {manifest['sellers']} statements, {manifest['rows']} transactions"
+        ))
+        if manifest["unbalanced"]:
+            self.stderr.write(f"Unbalanced statements for sellers: {manifest['unbalanced']}")
@@ -0,0 +1,149 @@
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core import partitions
+from core.seeding import (
+    SELLER_COLUMNS, TOPUP_COLUMNS, TRANSACTION_COLUMNS, IteratorFile, csv_chunks,
+    generate_seller, phone_number, phone_prefix, seller_name,
+)
+
+
+def copy_rows(cursor, table, columns, rows):
+    column_list = ", ".join(columns)
+    cursor.copy_expert(
+        f"COPY {table} ({column_list}) FROM STDIN WITH (FORMAT csv)",
+        IteratorFile(csv_chunks(rows)),
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic sellers, phone numbers, top-ups and transactions and load them with COPY. "
+        "Output is deterministic for a given --seed and --end; re-running resumes where it stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--sellers", type=int, default=1000)
+        parser.add_argument("--phones", type=int, default=100000)
+        parser.add_argument("--sales-per-seller", type=int, default=1000, help="Mean number of sales per seller.")
+        parser.add_argument("--days", type=int, default=180, help="Length of the generated history.")
+        parser.add_argument("--end", default=None, help="End of the history (YYYY-MM-DD, default: today UTC).")
+        parser.add_argument("--chunk", type=int, default=50, help="Sellers committed per transaction.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("seed_ledger requires PostgreSQL (it loads data with COPY).")
+        if options["phones"] > 10 ** 7:
+            raise CommandError("--phones must be at most 10,000,000")
+
+        seed = options["seed"]
+        if options["end"]:
+            end = datetime.strptime(options["end"], "%Y-%m-%d").replace(tzinfo=dt_timezone.utc)
+        else:
+            today = datetime.now(dt_timezone.utc)
+            end = datetime(today.year, today.month, today.day, tzinfo=dt_timezone.utc)
+
+        if partitions.is_partitioned():
+            start = partitions.add_months(partitions.month_start(end), -(options["days"] // 28 + 1))
+            _, failed = partitions.ensure_partitions(start, end)
+            for name, exc in failed.items():
+                self.stderr.write(f"partition {name} not created, its rows go to the default partition: {exc}")
+
+        phone_ids = self.load_phones(seed, options["phones"])
+        done = self.seeded_sellers(seed)
+        pending = [n for n in range(options["sellers"]) if seller_name(seed, n) not in done]
+        self.stdout.write(f"{len(done)} sellers already seeded, {len(pending)} to go")
+
+        for i in range(0, len(pending), options["chunk"]):
+            chunk = pending[i:i + options["chunk"]]
+            started = time.monotonic()
+            rows = self.load_chunk(seed, chunk, phone_ids, end, options)
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f"sellers {i + len(chunk)}/{len(pending)}: {rows} transactions "
+                f"({rows / max(elapsed, 1e-6):,.0f} rows/s)"
+            )
+
+        self.finish(seed)
+        self.stdout.write(self.style.SUCCESS("Seeding complete."))
+
+    def load_phones(self, seed, count):
+        """Insert the phone pool (skipping numbers that exist) and return ids by seed index."""
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE TEMP TABLE seed_phone (name varchar(200), number varchar(32))"
+            )
+            copy_rows(cursor, "seed_phone", ["name", "number"], (
+                (f"seed phone {index}", phone_number(seed, index)) for index in range(count)
+            ))
+            cursor.execute(
+                "INSERT INTO core_phonenumber (name, number, created_at) "
+                "SELECT name, number, now() FROM seed_phone ON CONFLICT (number) DO NOTHING"
+            )
+            cursor.execute(
+                "SELECT number, id FROM core_phonenumber WHERE number LIKE %s",
+                [phone_prefix(seed) + "%"],
+            )
+            by_number = dict(cursor.fetchall())
+            # Dropped explicitly rather than ON COMMIT: inside an outer
+            # transaction (e.g. a test case) this block only releases a savepoint.
+            cursor.execute("DROP TABLE seed_phone")
+        return [by_number[phone_number(seed, index)] for index in range(count)]
+
+    def seeded_sellers(self, seed):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM core_seller WHERE name LIKE %s", [f"seed-{seed}-%"])
+            return {row[0] for row in cursor.fetchall()}
+
+    def load_chunk(self, seed, seller_nos, phone_ids, end, options):
+        """Load a chunk of sellers in one transaction, so a crash never leaves a seller half-seeded.
+
+        Transactions are streamed first; the seller and top-up rows they
+        reference are collected on the way and copied afterwards, which the
+        deferred foreign keys allow.
+        """
+        sellers = []
+        topups = []
+        counter = [0]
+
+        def transaction_rows(seller_ids):
+            for seller_no, seller_id in zip(seller_nos, seller_ids):
+                history = generate_seller(
+                    seed, seller_no, seller_id, len(phone_ids), end,
+                    options["days"], options["sales_per_seller"],
+                )
+                sellers.append(history.seller_row)
+                topups.extend(history.topups)
+                for row in history.transactions:
+                    counter[0] += 1
+                    if row[4] is None:
+                        yield row
+                    else:
+                        yield row[:4] + (phone_ids[row[4]],) + row[5:]
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT nextval(pg_get_serial_sequence('core_seller', 'id')) FROM generate_series(1, %s)",
+                [len(seller_nos)],
+            )
+            seller_ids = [row[0] for row in cursor.fetchall()]
+            copy_rows(cursor, "core_transaction", TRANSACTION_COLUMNS, transaction_rows(seller_ids))
+            copy_rows(cursor, "core_seller", SELLER_COLUMNS, sellers)
+            copy_rows(cursor, "core_topuprequest", TOPUP_COLUMNS, topups)
+        return counter[0]
+
+    def finish(self, seed):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "UPDATE core_phonenumber p SET last_charged_at = t.last_at "
+                "FROM (SELECT phone_id, MAX(created_at) AS last_at FROM core_transaction "
+                "      WHERE reference LIKE %s GROUP BY phone_id) t "
+                "WHERE p.id = t.phone_id",
+                [f"seed:{seed}:%"],
+            )
+            for table in ("core_seller", "core_phonenumber", "core_topuprequest", "core_transaction"):
+                cursor.execute(f"ANALYZE {table}")
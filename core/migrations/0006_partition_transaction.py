@@ -0,0 +1,75 @@
+from django.db import migrations
+from django.utils import timezone
+
+from core import partitions
+
+COLUMNS = "id, tx_type, amount, balance_after, reference, metadata, created_at, phone_id, seller_id"
+
+
+def partition_transactions(apps, schema_editor):
+    """Rebuild core_transaction as a table range-partitioned by month on created_at.
+
+    Postgres requires every unique constraint on a partitioned table to include
+    the partition key, so the primary key becomes (id, created_at) and the
+    reference constraint becomes (reference, created_at).
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    cursor = schema_editor.connection.cursor()
+    cursor.execute("ALTER TABLE core_transaction RENAME TO core_transaction_unpartitioned")
+    cursor.execute("ALTER INDEX core_transaction_pkey RENAME TO core_transaction_unpartitioned_pkey")
+    cursor.execute(
+        """
+        CREATE TABLE core_transaction (
+            id bigint GENERATED BY DEFAULT AS IDENTITY,
+            tx_type varchar(10) NOT NULL,
+            amount numeric(18, 0) NOT NULL,
+            balance_after numeric(18, 0) NOT NULL,
+            reference varchar(255) NULL,
+            metadata jsonb NULL,
+            created_at timestamp with time zone NOT NULL,
+            phone_id bigint NULL
+                REFERENCES core_phonenumber (id) ON DELETE SET NULL DEFERRABLE INITIALLY DEFERRED,
+            seller_id bigint NOT NULL
+                REFERENCES core_seller (id) DEFERRABLE INITIALLY DEFERRED,
+            CONSTRAINT core_transaction_pkey PRIMARY KEY (id, created_at),
+            CONSTRAINT core_transaction_reference_created_at_uniq UNIQUE (reference, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    cursor.execute("DROP INDEX IF EXISTS core_transa_seller__4525eb_idx")
+    cursor.execute(
+        "CREATE INDEX core_transa_seller__4525eb_idx ON core_transaction (seller_id, created_at)"
+    )
+    cursor.execute("CREATE INDEX core_transaction_phone_id ON core_transaction (phone_id)")
+    cursor.execute(f"CREATE TABLE {partitions.DEFAULT_PARTITION} PARTITION OF core_transaction DEFAULT")
+
+    cursor.execute("SELECT MIN(created_at), MAX(created_at) FROM core_transaction_unpartitioned")
+    first, last = cursor.fetchone()
+    today = timezone.now()
+    first = min(first, today) if first else today
+    last = max(last, today) if last else today
+    for month in partitions.month_range(first, partitions.add_months(last, 3)):
+        partitions.create_partition(cursor, month)
+
+    cursor.execute(
+        f"INSERT INTO core_transaction ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM core_transaction_unpartitioned"
+    )
+    cursor.execute(
+        "SELECT setval(pg_get_serial_sequence('core_transaction', 'id'), "
+        "COALESCE((SELECT MAX(id) FROM core_transaction), 0) + 1, false)"
+    )
+    cursor.execute("DROP TABLE core_transaction_unpartitioned")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_alter_transaction_reference'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_transactions),
+    ]
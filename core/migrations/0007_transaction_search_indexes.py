@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:11
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_partition_transaction'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['phone', 'created_at'], name='core_tx_phone_created_idx'),
+        ),
+        # (phone, created_at) covers lookups by phone_id on its own.
+        migrations.RunSQL('DROP INDEX IF EXISTS core_transaction_phone_id', migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['metadata'], name='core_tx_metadata_gin', opclasses=['jsonb_path_ops']),
+        ),
+    ]
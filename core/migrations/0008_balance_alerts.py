@@ -0,0 +1,43 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_transaction_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='seller',
+            name='low_balance_alerted',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='seller',
+            name='low_balance_alerted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='seller',
+            name='low_balance_threshold',
+            field=models.DecimalField(blank=True, decimal_places=0, max_digits=18, null=True),
+        ),
+        migrations.CreateModel(
+            name='BalanceAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('balance', models.DecimalField(decimal_places=0, max_digits=18)),
+                ('threshold', models.DecimalField(decimal_places=0, max_digits=18)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('delivered_at', models.DateTimeField(blank=True, null=True)),
+                ('seller', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balance_alerts', to='core.seller')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('delivered_at__isnull', True)), fields=['id'], name='core_alert_pending_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:19
+
+from django.db import migrations, models
+
+CAPTURE_SQL = """
+CREATE OR REPLACE FUNCTION core_capture_change() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO core_changeevent (txid, source, op, object_id, payload, created_at)
+    VALUES (pg_current_xact_id()::text::bigint, TG_ARGV[0], TG_OP, NEW.id, to_jsonb(NEW), now());
+    PERFORM pg_notify('core_change_feed', '');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_transaction_change_feed
+    AFTER INSERT ON core_transaction
+    FOR EACH ROW EXECUTE FUNCTION core_capture_change('core_transaction');
+
+CREATE TRIGGER core_topuprequest_change_feed_insert
+    AFTER INSERT ON core_topuprequest
+    FOR EACH ROW EXECUTE FUNCTION core_capture_change('core_topuprequest');
+
+CREATE TRIGGER core_topuprequest_change_feed_update
+    AFTER UPDATE ON core_topuprequest
+    FOR EACH ROW
+    WHEN (OLD.approved IS DISTINCT FROM NEW.approved OR OLD.applied_at IS DISTINCT FROM NEW.applied_at)
+    EXECUTE FUNCTION core_capture_change('core_topuprequest');
+"""
+
+DROP_CAPTURE_SQL = """
+DROP TRIGGER IF EXISTS core_topuprequest_change_feed_update ON core_topuprequest;
+DROP TRIGGER IF EXISTS core_topuprequest_change_feed_insert ON core_topuprequest;
+DROP TRIGGER IF EXISTS core_transaction_change_feed ON core_transaction;
+DROP FUNCTION IF EXISTS core_capture_change();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_balance_alerts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedConsumer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('last_txid', models.BigIntegerField(default=0)),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ChangeEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('txid', models.BigIntegerField()),
+                ('source', models.CharField(max_length=64)),
+                ('op', models.CharField(max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('payload', models.JSONField()),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['txid', 'id'], name='core_change_cursor_idx')],
+            },
+        ),
+        migrations.RunSQL(CAPTURE_SQL, DROP_CAPTURE_SQL),
+    ]
@@ -0,0 +1,77 @@
+from django.db import migrations, models
+
+CLAIM_SQL = """
+INSERT INTO core_transactionreference (reference, transaction_id)
+SELECT DISTINCT ON (reference) reference, id FROM core_transaction
+WHERE reference IS NOT NULL
+ORDER BY reference, id;
+
+CREATE OR REPLACE FUNCTION core_claim_reference() RETURNS trigger AS $$
+BEGIN
+    IF NEW.reference IS NULL THEN
+        RETURN NEW;
+    END IF;
+    -- A row moved to another partition by an UPDATE of created_at is
+    -- re-inserted with the same id and keeps its claim.
+    INSERT INTO core_transactionreference AS claim (reference, transaction_id)
+    VALUES (NEW.reference, NEW.id)
+    ON CONFLICT (reference) DO UPDATE SET transaction_id = EXCLUDED.transaction_id
+    WHERE claim.transaction_id = EXCLUDED.transaction_id;
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'duplicate ledger reference %', NEW.reference
+            USING ERRCODE = 'unique_violation', CONSTRAINT = 'core_transactionreference_pkey';
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_transaction_claim_reference
+    BEFORE INSERT ON core_transaction
+    FOR EACH ROW EXECUTE FUNCTION core_claim_reference();
+"""
+
+DROP_CLAIM_SQL = """
+DROP TRIGGER IF EXISTS core_transaction_claim_reference ON core_transaction;
+DROP FUNCTION IF EXISTS core_claim_reference();
+"""
+
+
+class Migration(migrations.Migration):
+    """Restore global uniqueness of Transaction.reference on the partitioned ledger.
+
+    0006 could only keep UNIQUE (reference, created_at) on the partitioned
+    table and left the model state claiming ``unique=True``. The state now
+    matches the real constraint, and references are claimed in the
+    unpartitioned core_transactionreference table instead.
+    """
+
+    dependencies = [
+        ('core', '0009_change_feed'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            # Both already match the table 0006 created.
+            state_operations=[
+                migrations.AlterField(
+                    model_name='transaction',
+                    name='reference',
+                    field=models.CharField(blank=True, max_length=255, null=True),
+                ),
+                migrations.AddConstraint(
+                    model_name='transaction',
+                    constraint=models.UniqueConstraint(
+                        fields=('reference', 'created_at'), name='core_transaction_reference_created_at_uniq'
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TransactionReference',
+            fields=[
+                ('reference', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('transaction_id', models.BigIntegerField()),
+            ],
+        ),
+        migrations.RunSQL(CLAIM_SQL, DROP_CLAIM_SQL),
+    ]
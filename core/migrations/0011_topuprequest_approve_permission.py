@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:29
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_transaction_reference_claims'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='topuprequest',
+            options={'permissions': [('approve_topuprequest', 'Can approve and apply top-up requests')]},
+        ),
+    ]
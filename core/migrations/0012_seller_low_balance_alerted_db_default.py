@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_topuprequest_approve_permission'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='seller',
+            name='low_balance_alerted',
+            field=models.BooleanField(db_default=False, default=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:32
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_seller_low_balance_alerted_db_default'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='changeevent',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['created_at'], name='core_change_created_brin'),
+        ),
+    ]
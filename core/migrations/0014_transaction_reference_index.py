@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """core_transactionreference enforces reference uniqueness, so the
+    partition-level (reference, created_at) constraint only cost a second
+    unique btree on every insert; lookups need a plain index."""
+
+    dependencies = [
+        ('core', '0013_change_event_retention_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['reference'], name='core_tx_reference_idx'),
+        ),
+        migrations.RemoveConstraint(
+            model_name='transaction',
+            name='core_transaction_reference_created_at_uniq',
+        ),
+    ]
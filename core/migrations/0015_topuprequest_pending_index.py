@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_transaction_reference_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='topuprequest',
+            index=models.Index(condition=models.Q(('applied_at__isnull', True)), fields=['id'], name='core_topup_pending_idx'),
+        ),
+    ]
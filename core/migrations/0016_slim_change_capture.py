@@ -0,0 +1,52 @@
+from django.db import migrations
+
+CAPTURE_SQL = """
+CREATE OR REPLACE FUNCTION core_capture_change() RETURNS trigger AS $$
+DECLARE
+    payload jsonb;
+BEGIN
+    IF TG_ARGV[0] = 'core_transaction' THEN
+        payload := jsonb_build_object(
+            'seller_id', NEW.seller_id, 'tx_type', NEW.tx_type, 'amount', NEW.amount,
+            'balance_after', NEW.balance_after, 'reference', NEW.reference, 'created_at', NEW.created_at
+        );
+    ELSE
+        payload := jsonb_build_object(
+            'seller_id', NEW.seller_id, 'amount', NEW.amount, 'approved', NEW.approved,
+            'applied_at', NEW.applied_at
+        );
+    END IF;
+    INSERT INTO core_changeevent (txid, source, op, object_id, payload, created_at)
+    VALUES (pg_current_xact_id()::text::bigint, TG_ARGV[0], TG_OP, NEW.id, payload, now());
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+PREVIOUS_CAPTURE_SQL = """
+CREATE OR REPLACE FUNCTION core_capture_change() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO core_changeevent (txid, source, op, object_id, payload, created_at)
+    VALUES (pg_current_xact_id()::text::bigint, TG_ARGV[0], TG_OP, NEW.id, to_jsonb(NEW), now());
+    PERFORM pg_notify('core_change_feed', '');
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+    """Keep the change capture cheap on the ledger write path.
+
+    NOTIFY made every committing transaction take PostgreSQL's cluster-wide
+    notify lock, serialising ledger commits; readers now poll instead. The
+    payload holds only the columns consumers use, not a copy of the row.
+    """
+
+    dependencies = [
+        ('core', '0015_topuprequest_pending_index'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CAPTURE_SQL, PREVIOUS_CAPTURE_SQL),
+    ]
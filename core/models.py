@@ -2,8 +2,11 @@ import uuid
 from sqlite3 import IntegrityError
 
 from django.db import models
+from django.contrib.postgres.indexes import BrinIndex, GinIndex
 from django.core.validators import MinValueValidator
 
+from . import contention
+
 try:
     from django.db.models import JSONField
 except ImportError:
@@ -26,6 +29,11 @@ class Seller(models.Model):
     )
     version = models.BigIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Falls back to settings.LOW_BALANCE_THRESHOLD when null.
+    low_balance_threshold = models.DecimalField(max_digits=18, decimal_places=0, null=True, blank=True)
+    # db_default keeps raw writers (e.g. the seed_ledger COPY) from tripping NOT NULL.
+    low_balance_alerted = models.BooleanField(default=False, db_default=False)
+    low_balance_alerted_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         constraints = [
@@ -35,6 +43,40 @@ class Seller(models.Model):
     def __str__(self):
         return f"Seller(id={self.pk}, name={self.name}, balance={self.balance})"
 
+    def check_low_balance(self):
+        """Record a low-balance alert if the (locked, already updated) balance crossed the threshold.
+
+        Debounced with hysteresis: once alerted, the seller is only re-armed
+        when the balance climbs LOW_BALANCE_REARM_MARGIN above the threshold,
+        and never alerted twice within LOW_BALANCE_ALERT_COOLDOWN.
+        Returns the fields the caller must add to its update.
+        """
+        threshold = self.low_balance_threshold
+        if threshold is None:
+            threshold = getattr(settings, "LOW_BALANCE_THRESHOLD", None)
+        if threshold is None:
+            return []
+        threshold = Decimal(threshold)
+
+        if self.low_balance_alerted:
+            margin = Decimal(str(getattr(settings, "LOW_BALANCE_REARM_MARGIN", 0.1)))
+            if self.balance >= threshold * (1 + margin):
+                self.low_balance_alerted = False
+                return ["low_balance_alerted"]
+            return []
+
+        if self.balance >= threshold:
+            return []
+        now = timezone.now()
+        cooldown = getattr(settings, "LOW_BALANCE_ALERT_COOLDOWN", timedelta(hours=1))
+        if self.low_balance_alerted_at and now - self.low_balance_alerted_at < cooldown:
+            return []
+
+        BalanceAlert.objects.create(seller=self, balance=self.balance, threshold=threshold)
+        self.low_balance_alerted = True
+        self.low_balance_alerted_at = now
+        return ["low_balance_alerted", "low_balance_alerted_at"]
+
 
 class PhoneNumber(models.Model):
     name = models.CharField(max_length=200)
@@ -57,17 +99,41 @@ class Transaction(models.Model):
     amount = models.DecimalField(max_digits=18, decimal_places=0)
     balance_after = models.DecimalField(max_digits=18, decimal_places=0)
     phone = models.ForeignKey(PhoneNumber, null=True, blank=True, on_delete=models.SET_NULL)
-    reference = models.CharField(max_length=255, null=True, blank=True, unique=True)
+    # Unique through TransactionReference while its month is online; a
+    # partitioned table cannot enforce it itself.
+    reference = models.CharField(max_length=255, null=True, blank=True)
     metadata = JSONField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        indexes = [models.Index(fields=["seller", "created_at"])]
+        indexes = [
+            models.Index(fields=["seller", "created_at"]),
+            models.Index(fields=["phone", "created_at"], name="core_tx_phone_created_idx"),
+            GinIndex(fields=["metadata"], opclasses=["jsonb_path_ops"], name="core_tx_metadata_gin"),
+            models.Index(fields=["reference"], name="core_tx_reference_idx"),
+        ]
 
     def __str__(self):
         return f"TX({self.pk}) {self.tx_type} {self.amount} seller={self.seller_id} after={self.balance_after}"
 
 
+class TransactionReference(models.Model):
+    """Claim on a ledger reference, kept in an unpartitioned table so it is unique across all months.
+
+    Rows are written by a BEFORE INSERT trigger on core_transaction, in the
+    same transaction as the ledger row (ORM, bulk_create and COPY alike); a
+    second row with the same reference fails with an IntegrityError. Claims
+    are deleted with their partition by archive_transactions, so references
+    are unique for as long as their month is online.
+    """
+
+    reference = models.CharField(max_length=255, primary_key=True)
+    transaction_id = models.BigIntegerField()
+
+    def __str__(self):
+        return f"TransactionReference({self.reference}) tx={self.transaction_id}"
+
+
 class TopUpRequest(models.Model):
     seller = models.ForeignKey(Seller, on_delete=models.CASCADE, related_name="topup_requests")
     amount = models.DecimalField(max_digits=18, decimal_places=0, validators=[MinValueValidator(1)])
@@ -78,6 +144,15 @@ class TopUpRequest(models.Model):
     approved_by = models.CharField(max_length=200, null=True, blank=True)
     notes = models.TextField(null=True, blank=True)
 
+    class Meta:
+        permissions = [("approve_topuprequest", "Can approve and apply top-up requests")]
+        indexes = [
+            # Serves the admin's pending (applied_at empty) filter in -id order.
+            models.Index(
+                fields=["id"], name="core_topup_pending_idx", condition=models.Q(applied_at__isnull=True)
+            ),
+        ]
+
     def __str__(self):
         return f"TopUpRequest({self.pk}) seller={self.seller_id} amount={self.amount} applied={bool(self.applied_at)}"
 
@@ -96,13 +171,15 @@ class TopUpRequest(models.Model):
         )
         return obj, created
 
-    def apply(self, approver=None):
+    def apply(self, approver=None, lock_timeout_ms=None, nowait=None):
         """Apply top-up requests atomically and safely."""
+        lock_timeout_ms, nowait = contention.lock_options(lock_timeout_ms, nowait)
         with transaction.atomic():
+            contention.set_lock_timeout(lock_timeout_ms)
             # Lock request and seller
-            tr = TopUpRequest.objects.select_for_update().get(pk=self.pk)
+            tr = TopUpRequest.objects.select_for_update(nowait=nowait).get(pk=self.pk)
             # lock seller row explicitly
-            seller = Seller.objects.select_for_update().get(pk=tr.seller_id)
+            seller = Seller.objects.select_for_update(nowait=nowait).get(pk=tr.seller_id)
 
             if tr.applied_at:
                 raise TopUpAlreadyAppliedError("TopUp already applied")
@@ -110,7 +187,7 @@ class TopUpRequest(models.Model):
             # Update seller balance directly
             seller.balance += tr.amount
             seller.version += 1
-            seller.save(update_fields=["balance", "version"])
+            seller.save(update_fields=["balance", "version", *seller.check_low_balance()])
 
             # Create transaction log
             Transaction.objects.create(
@@ -130,29 +207,150 @@ class TopUpRequest(models.Model):
 
             return seller.balance
 
+    @classmethod
+    def apply_bulk(cls, pks, approver=None, lock_timeout_ms=None):
+        """Apply many top-up requests in one transaction with set-based writes.
+
+        Already-applied requests are skipped. Sellers are locked in id order so
+        concurrent bulk applies cannot deadlock. Returns the number applied.
+        """
+        lock_timeout_ms, _ = contention.lock_options(lock_timeout_ms)
+        with transaction.atomic():
+            contention.set_lock_timeout(lock_timeout_ms)
+            requests = list(
+                cls.objects.select_for_update()
+                .filter(pk__in=pks, applied_at__isnull=True)
+                .order_by("pk")
+            )
+            if not requests:
+                return 0
+
+            seller_ids = sorted({tr.seller_id for tr in requests})
+            sellers = {
+                seller.pk: seller
+                for seller in Seller.objects.select_for_update().filter(pk__in=seller_ids).order_by("pk")
+            }
+
+            ledger = []
+            for tr in requests:
+                seller = sellers[tr.seller_id]
+                seller.balance += tr.amount
+                seller.version += 1
+                ledger.append(Transaction(
+                    seller_id=seller.pk,
+                    tx_type=Transaction.TOPUP,
+                    amount=tr.amount,
+                    balance_after=seller.balance,
+                    reference=f"topup:{tr.idempotency_key}",
+                    metadata={"applied_by": approver} if approver else None,
+                ))
+
+            alert_fields = set()
+            for seller in sellers.values():
+                alert_fields.update(seller.check_low_balance())
+            Seller.objects.bulk_update(sellers.values(), ["balance", "version", *sorted(alert_fields)])
+            Transaction.objects.bulk_create(ledger)
+
+            updates = {"applied_at": timezone.now(), "approved": True}
+            if approver:
+                updates["approved_by"] = approver
+            cls.objects.filter(pk__in=[tr.pk for tr in requests]).update(**updates)
+
+            return len(requests)
+
+
+class BalanceAlert(models.Model):
+    """A seller's balance fell below its threshold; delivered in batches by core.alerts."""
+
+    seller = models.ForeignKey(Seller, on_delete=models.CASCADE, related_name="balance_alerts")
+    balance = models.DecimalField(max_digits=18, decimal_places=0)
+    threshold = models.DecimalField(max_digits=18, decimal_places=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["id"], name="core_alert_pending_idx", condition=models.Q(delivered_at__isnull=True)
+            ),
+        ]
 
+    def __str__(self):
+        return f"BalanceAlert({self.pk}) seller={self.seller_id} balance={self.balance} threshold={self.threshold}"
+
+
+class ChangeEvent(models.Model):
+    """Row change captured by database triggers on core_transaction and core_topuprequest.
+
+    ``txid`` is the writing transaction's id; readers order by (txid, id) and
+    only return events from transactions older than every running one, so an
+    event can never appear behind a cursor that has already passed it.
+    """
+
+    TRANSACTION = "core_transaction"
+    TOPUP_REQUEST = "core_topuprequest"
+
+    txid = models.BigIntegerField()
+    source = models.CharField(max_length=64)
+    op = models.CharField(max_length=10)
+    object_id = models.BigIntegerField()
+    payload = JSONField()
+    created_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["txid", "id"], name="core_change_cursor_idx"),
+            # Append-only, so a BRIN index serves retention pruning at almost no write cost.
+            BrinIndex(fields=["created_at"], name="core_change_created_brin"),
+        ]
+
+    def __str__(self):
+        return f"ChangeEvent({self.txid}:{self.pk}) {self.op} {self.source}#{self.object_id}"
+
+
+class FeedConsumer(models.Model):
+    """Server-side offset of a change feed consumer."""
+
+    name = models.CharField(max_length=100, unique=True)
+    last_txid = models.BigIntegerField(default=0)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"FeedConsumer({self.name}) at {self.last_txid}:{self.last_id}"
+
+
+from datetime import timedelta
+from django.conf import settings
 from django.utils import timezone
 from django.db import transaction
 from django.db.models import F
 from decimal import Decimal
 
 
-def sell_charge(seller_id: int, phone_number: str, amount: Decimal, reference: str = None, metadata: dict = None):
-    """Deduct the amount from the seller's account and record the sales transaction atomically."""
+def sell_charge(seller_id: int, phone_number: str, amount: Decimal, reference: str = None, metadata: dict = None,
+                lock_timeout_ms: int = None, nowait: bool = None):
+    """Deduct the amount from the seller's account and record the sales transaction atomically.
+
+    The seller lock is waited for at most ``lock_timeout_ms`` (or not at all
+    with ``nowait``); both default to the LOCK_TIMEOUT_MS / LOCK_NOWAIT settings.
+    """
     amount = Decimal(amount)
     if amount <= 0:
         raise ValueError("Amount must be positive")
 
+    lock_timeout_ms, nowait = contention.lock_options(lock_timeout_ms, nowait)
     with transaction.atomic():
+        contention.set_lock_timeout(lock_timeout_ms)
         # Lock seller
-        seller = Seller.objects.select_for_update().get(pk=seller_id)
+        seller = Seller.objects.select_for_update(nowait=nowait).get(pk=seller_id)
         if seller.balance < amount:
             raise InsufficientBalanceError("Insufficient balance")
 
         # Deduct balance
         seller.balance -= amount
         seller.version += 1
-        seller.save(update_fields=["balance", "version"])
+        seller.save(update_fields=["balance", "version", *seller.check_low_balance()])
 
         # Get or create phone safely
         try:
@@ -0,0 +1,57 @@
+import json
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+
+
+def estimate_count(queryset):
+    """Return the planner's row estimate for ``queryset`` or None if it is unavailable."""
+    if connections[queryset.db].vendor != "postgresql":
+        return None
+    plan = json.loads(queryset.order_by().explain(format="json"))
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that trusts the query planner for large result sets instead of COUNT(*).
+
+    Small results (under ``exact_threshold`` estimated rows) are still counted
+    exactly, where COUNT(*) is cheap and an estimate would look wrong.
+    """
+
+    exact_threshold = 10000
+    count_is_estimate = False
+
+    @cached_property
+    def count(self):
+        if not hasattr(self.object_list, "explain"):
+            return super().count
+        estimate = estimate_count(self.object_list)
+        if estimate is None or estimate < self.exact_threshold:
+            return super().count
+        self.count_is_estimate = True
+        return estimate
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    django_paginator_class = EstimatedCountPaginator
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def get_paginated_response(self, data):
+        return Response({
+            "count": self.page.paginator.count,
+            "count_is_estimate": self.page.paginator.count_is_estimate,
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        schema = super().get_paginated_response_schema(schema)
+        schema["properties"]["count_is_estimate"] = {"type": "boolean"}
+        return schema
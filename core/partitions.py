@@ -0,0 +1,133 @@
+import logging
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import DatabaseError, connection, transaction
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "core_transaction"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+
+
+def month_start(value):
+    """Return the first instant (UTC) of the month containing ``value``."""
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def add_months(value, months):
+    index = value.year * 12 + (value.month - 1) + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=dt_timezone.utc)
+
+
+def partition_name(value):
+    """Name of the monthly partition holding ``value``, e.g. core_transaction_p2025_09."""
+    return f"{PARENT_TABLE}_p{value.year:04d}_{value.month:02d}"
+
+
+def month_range(start, end):
+    """Yield the first day of every month from ``start`` up to and including ``end``."""
+    current = month_start(start)
+    last = month_start(end)
+    while current <= last:
+        yield current
+        current = add_months(current, 1)
+
+
+def is_partitioned():
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cur:
+        cur.execute(
+            "SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = %s",
+            [PARENT_TABLE],
+        )
+        return cur.fetchone() is not None
+
+
+def create_partition(cursor, start):
+    """Create the partition for the month starting at ``start`` if it is missing.
+
+    Rows for that month that already landed in the default partition would make
+    ``CREATE TABLE ... PARTITION OF`` fail, so they are moved into a new table
+    that is then attached. Call it inside a transaction: on failure the rows
+    stay in the default partition.
+    """
+    name = partition_name(start)
+    end = add_months(start, 1)
+    cursor.execute(
+        f'SELECT 1 FROM "{DEFAULT_PARTITION}" WHERE created_at >= %s AND created_at < %s LIMIT 1',
+        [start, end],
+    )
+    if cursor.fetchone() is None:
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{PARENT_TABLE}" '
+            f"FOR VALUES FROM (%s) TO (%s)",
+            [start, end],
+        )
+        return name
+
+    # ATTACH needs this lock anyway; taking it first keeps new rows for the
+    # month from reaching the default partition while the old ones move.
+    cursor.execute(f'LOCK TABLE "{DEFAULT_PARTITION}" IN ACCESS EXCLUSIVE MODE')
+    cursor.execute(f'CREATE TABLE "{name}" (LIKE "{PARENT_TABLE}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+    cursor.execute(
+        f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" '
+        f"WHERE created_at >= %s AND created_at < %s RETURNING *) "
+        f'INSERT INTO "{name}" SELECT * FROM moved',
+        [start, end],
+    )
+    logger.warning("Moved %s rows from %s into %s", cursor.rowcount, DEFAULT_PARTITION, name)
+    cursor.execute(
+        f'ALTER TABLE "{PARENT_TABLE}" ATTACH PARTITION "{name}" FOR VALUES FROM (%s) TO (%s)',
+        [start, end],
+    )
+    return name
+
+
+def ensure_partitions(start, end):
+    """Make sure a partition exists for every month between ``start`` and ``end``.
+
+    Every month gets its own transaction, and a month that cannot be created
+    is logged and skipped so the later ones are still created. Returns
+    ``(ensured, failed)``; ``failed`` maps partition names to the error.
+    """
+    ensured, failed = [], {}
+    for month in month_range(start, end):
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                ensured.append(create_partition(cursor, month))
+        except DatabaseError as exc:
+            logger.error("Could not create partition %s: %s", partition_name(month), exc)
+            failed[partition_name(month)] = exc
+    return ensured, failed
+
+
+def list_partitions():
+    """Return ``(name, lower_bound)`` for every monthly partition, oldest first."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = %s AND c.relname <> %s ORDER BY c.relname",
+            [PARENT_TABLE, DEFAULT_PARTITION],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    prefix = f"{PARENT_TABLE}_p"
+    partitions = []
+    for name in names:
+        year, month = name[len(prefix):].split("_")
+        partitions.append((name, datetime(int(year), int(month), 1, tzinfo=dt_timezone.utc)))
+    return partitions
+
+
+def detach_partition(name):
+    with connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE "{PARENT_TABLE}" DETACH PARTITION "{name}"')
+
+
+def drop_table(name):
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS "{name}"')
@@ -0,0 +1,129 @@
+import logging
+import threading
+import time
+from collections import Counter, deque
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+_buffer_lock = threading.Lock()
+_buffer = deque(maxlen=getattr(settings, "SQL_PROFILING_BUFFER_SIZE", 200))
+
+
+class QueryRecorder:
+    """``connection.execute_wrapper`` callable that records every statement and its duration."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - started))
+
+    def summary(self, label, slowest=5):
+        counts = Counter(sql for sql, _ in self.queries)
+        ranked = sorted(self.queries, key=lambda query: query[1], reverse=True)[:slowest]
+        return {
+            "label": label,
+            "at": time.time(),
+            "query_count": len(self.queries),
+            "total_ms": round(sum(duration for _, duration in self.queries) * 1000, 3),
+            "duplicates": [
+                {"sql": sql, "count": count} for sql, count in counts.most_common() if count > 1
+            ],
+            "slowest": [
+                {"sql": sql, "ms": round(duration * 1000, 3)} for sql, duration in ranked
+            ],
+        }
+
+
+class profile_queries:
+    """Record the queries run on the default connection inside a ``with`` block.
+
+    The summary is available as ``.summary`` after the block exits.
+    """
+
+    def __init__(self, label):
+        self.label = label
+        self.recorder = QueryRecorder()
+        self.summary = None
+        self._wrapper = None
+
+    def __enter__(self):
+        self._wrapper = connection.execute_wrapper(self.recorder)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._wrapper.__exit__(*exc_info)
+        self.summary = self.recorder.summary(self.label)
+
+
+def record(summary):
+    """Store a profile in the ring buffer and log it."""
+    with _buffer_lock:
+        _buffer.append(summary)
+    logger.info(
+        "%s: %d queries in %.1f ms (%d duplicated)",
+        summary["label"], summary["query_count"], summary["total_ms"], len(summary["duplicates"]),
+    )
+
+
+def recent_profiles():
+    with _buffer_lock:
+        return list(_buffer)
+
+
+def clear_profiles():
+    with _buffer_lock:
+        _buffer.clear()
+
+
+class SQLProfilingMiddleware:
+    """Per-request SQL profile, enabled with ``SQL_PROFILING_ENABLED``."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, "SQL_PROFILING_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with profile_queries(request.path) as profile:
+            response = self.get_response(request)
+        match = getattr(request, "resolver_match", None)
+        if match is not None:
+            profile.summary["label"] = f"view:{match.view_name}"
+        record(profile.summary)
+        return response
+
+
+_task_profiles = {}
+
+
+def _task_prerun(task_id=None, task=None, **kwargs):
+    profile = profile_queries(f"task:{task.name}")
+    profile.__enter__()
+    _task_profiles[task_id] = profile
+
+
+def _task_postrun(task_id=None, **kwargs):
+    profile = _task_profiles.pop(task_id, None)
+    if profile is not None:
+        profile.__exit__(None, None, None)
+        record(profile.summary)
+
+
+def connect_celery_signals():
+    """Profile every Celery task when ``SQL_PROFILING_ENABLED`` is set."""
+    if not getattr(settings, "SQL_PROFILING_ENABLED", False):
+        return
+    from celery.signals import task_postrun, task_prerun
+
+    task_prerun.connect(_task_prerun, weak=False, dispatch_uid="core.profiling.prerun")
+    task_postrun.connect(_task_postrun, weak=False, dispatch_uid="core.profiling.postrun")
@@ -0,0 +1,151 @@
+import csv
+import io
+import json
+import random
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+SALE_AMOUNTS = [10000, 20000, 50000, 100000, 200000]
+TOPUP_AMOUNTS = [1000000, 2000000, 5000000, 10000000]
+
+SELLER_COLUMNS = ["id", "name", "balance", "version", "created_at", "low_balance_alerted"]
+TOPUP_COLUMNS = [
+    "seller_id", "amount", "created_at", "idempotency_key",
+    "approved", "applied_at", "approved_by", "notes",
+]
+TRANSACTION_COLUMNS = [
+    "seller_id", "tx_type", "amount", "balance_after",
+    "phone_id", "reference", "metadata", "created_at",
+]
+
+
+def seller_name(seed, seller_no):
+    return f"seed-{seed}-{seller_no:07d}"
+
+
+def phone_number(seed, index):
+    return f"09{seed % 100:02d}{index:07d}"
+
+
+def phone_prefix(seed):
+    return f"09{seed % 100:02d}"
+
+
+class SellerHistory:
+    """The generated rows for one seller, in ledger order.
+
+    ``transactions`` rows reference phones by their seed index (see
+    ``phone_number``); the loader swaps in real ids.
+    """
+
+    def __init__(self, seller_row, topups, transactions):
+        self.seller_row = seller_row
+        self.topups = topups
+        self.transactions = transactions
+
+
+def generate_seller(seed, seller_no, seller_id, phone_count, end, days, mean_sales):
+    """Simulate one seller's history deterministically from ``(seed, seller_no)``.
+
+    Activity is heavy-tailed across sellers (Pareto sale counts) and across
+    phones (each seller favours a few numbers). Whenever a sale would overdraw
+    the balance an applied top-up is inserted first, so ``balance_after`` is a
+    correct running sum and the final balance is never negative.
+    """
+    rng = random.Random(f"{seed}:{seller_no}")
+    start = end - timedelta(days=days)
+    span = (end - start).total_seconds()
+
+    sales = min(int(rng.paretovariate(1.5) * mean_sales / 3) + 1, mean_sales * 50)
+    offsets = sorted(rng.random() * span for _ in range(sales))
+    favourite = rng.randrange(phone_count)
+
+    balance = Decimal(0)
+    version = 0
+    topups = []
+    transactions = []
+    for n, offset in enumerate(offsets):
+        ts = start + timedelta(seconds=offset)
+        amount = Decimal(rng.choice(SALE_AMOUNTS))
+
+        if balance < amount:
+            topup_amount = Decimal(max(rng.choice(TOPUP_AMOUNTS), amount))
+            key = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+            balance += topup_amount
+            version += 1
+            topups.append((
+                seller_id, topup_amount, ts - timedelta(seconds=rng.uniform(60, 3600)), key,
+                True, ts, "seed", None,
+            ))
+            transactions.append((
+                seller_id, "TOPUP", topup_amount, balance,
+                None, f"topup:{key}", {"applied_by": "seed"}, ts,
+            ))
+            ts += timedelta(milliseconds=1)
+
+        phone_index = (favourite + int(rng.paretovariate(1.2)) - 1) % phone_count
+        balance -= amount
+        version += 1
+        transactions.append((
+            seller_id, "SALE", -amount, balance,
+            phone_index, f"seed:{seed}:{seller_no}:{n}",
+            {"phone_number": phone_number(seed, phone_index)}, ts,
+        ))
+
+    seller_row = (seller_id, seller_name(seed, seller_no), balance, version, start, False)
+    return SellerHistory(seller_row, topups, transactions)
+
+
+def _csv_value(value):
+    if value is None:
+        return None
+    if isinstance(value, dict):
+        return json.dumps(value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def csv_chunks(rows, rows_per_chunk=2000):
+    """Encode ``rows`` as CSV text for ``COPY ... FROM STDIN WITH (FORMAT csv)``.
+
+    ``None`` becomes an unquoted empty field, which COPY reads as NULL.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    pending = 0
+    for row in rows:
+        values = [_csv_value(value) for value in row]
+        writer.writerow(["" if value is None else value for value in values])
+        pending += 1
+        if pending >= rows_per_chunk:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if pending:
+        yield buffer.getvalue()
+
+
+class IteratorFile(io.TextIOBase):
+    """Read-only file object over an iterator of strings, for cursor.copy_expert."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = ""
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            try:
+                self._buffer += next(self._chunks)
+            except StopIteration:
+                break
+        if size < 0:
+            data, self._buffer = self._buffer, ""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
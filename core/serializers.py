@@ -1,11 +1,11 @@
 from rest_framework import serializers
-from .models import Seller, PhoneNumber, Transaction, TopUpRequest
+from .models import Seller, PhoneNumber, Transaction, TopUpRequest, ChangeEvent
 
 
 class SellerSerializer(serializers.ModelSerializer):
     class Meta:
         model = Seller
-        fields = ["id", "name", "balance", "version", "created_at"]
+        fields = ["id", "name", "balance", "version", "low_balance_threshold", "created_at"]
         read_only_fields = ["balance", "version", "created_at"]
 
 
@@ -72,3 +72,19 @@ class SellChargeSerializer(serializers.Serializer):
         if value <= 0:
             raise serializers.ValidationError("amount must be > 0")
         return value
+
+
+class ChangeEventSerializer(serializers.ModelSerializer):
+    cursor = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ChangeEvent
+        fields = ["cursor", "source", "op", "object_id", "payload", "created_at"]
+
+    def get_cursor(self, obj):
+        return f"{obj.txid}:{obj.pk}"
+
+
+class FeedAckSerializer(serializers.Serializer):
+    consumer = serializers.CharField(max_length=100)
+    cursor = serializers.CharField()
@@ -0,0 +1,240 @@
+import csv
+import functools
+import gzip
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+from . import partitions
+from .archive import iter_archived_transactions, load_manifests
+from .models import Seller, Transaction
+
+STATEMENT_COLUMNS = ["id", "created_at", "tx_type", "amount", "balance_after", "reference", "phone_number"]
+FETCH_SIZE = 2000
+
+
+def statements_dir():
+    return Path(getattr(settings, "STATEMENTS_DIR", Path(settings.BASE_DIR) / "statements"))
+
+
+def parse_period(value):
+    """``"2025-09"`` -> (start, end) of that month in UTC."""
+    start = datetime.strptime(value, "%Y-%m").replace(tzinfo=dt_timezone.utc)
+    return start, partitions.add_months(start, 1)
+
+
+def period_dir(period, directory=None):
+    return Path(directory or statements_dir()) / period
+
+
+def _write_json_atomic(path, data):
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, indent=2)
+    os.replace(tmp, path)
+
+
+def checkpoint_path(period, seller_id, directory=None):
+    return period_dir(period, directory) / f"seller_{seller_id}.json"
+
+
+class ArchivedPeriodError(ValueError):
+    pass
+
+
+def check_not_archived(period):
+    """Refuse periods whose partition was archived; the live table no longer holds their rows."""
+    start, end = parse_period(period)
+    for manifest in load_manifests():
+        if (datetime.fromisoformat(manifest["period_start"]) < end
+                and datetime.fromisoformat(manifest["period_end"]) > start):
+            raise ArchivedPeriodError(
+                f"{period} has been archived to {manifest['file']}; statements are only built "
+                f"for months still in the database (read it with core.archive.iter_archived_transactions)"
+            )
+
+
+def previous_period(period):
+    start, _ = parse_period(period)
+    return partitions.add_months(start, -1).strftime("%Y-%m")
+
+
+@functools.lru_cache(maxsize=4)
+def _archived_balances(before, fingerprint):
+    latest = {}
+    for tx in iter_archived_transactions(end=before):
+        key = (tx["created_at"], tx["id"])
+        if tx["seller_id"] not in latest or key > latest[tx["seller_id"]][0]:
+            latest[tx["seller_id"]] = (key, tx["balance_after"])
+    return {seller_id: balance for seller_id, (_, balance) in latest.items()}
+
+
+def archived_balances(before):
+    """seller_id -> ``balance_after`` of the seller's last archived transaction before ``before``.
+
+    Built in one pass over the archive and cached per worker until the set of
+    archive files changes.
+    """
+    fingerprint = tuple(manifest["sha256"] for manifest in load_manifests())
+    if not fingerprint:
+        return {}
+    return _archived_balances(before, fingerprint)
+
+
+def opening_balance(seller_id, period, directory=None):
+    """Balance at the start of ``period``.
+
+    Taken from the last transaction before the period still in the database;
+    once that has been archived, from the previous period's checkpoint, and
+    failing that from the archive itself. Sellers with no history open at 0.
+    """
+    start, _ = parse_period(period)
+    balance = (
+        Transaction.objects.filter(seller_id=seller_id, created_at__lt=start)
+        .order_by("-created_at", "-id")
+        .values_list("balance_after", flat=True)
+        .first()
+    )
+    if balance is not None:
+        return balance
+
+    previous = checkpoint_path(previous_period(period), seller_id, directory)
+    if previous.exists():
+        with open(previous, encoding="utf-8") as fh:
+            return Decimal(json.load(fh)["closing_balance"])
+
+    return archived_balances(start).get(seller_id, Decimal(0))
+
+
+def build_statement(seller_id, period, directory=None):
+    """Write one seller's statement for ``period`` and its checkpoint file.
+
+    The period is streamed through the (seller, created_at) index. The opening
+    balance comes from ``opening_balance`` and the closing balance is the
+    ``balance_after`` of the last transaction inside the period. The
+    checkpoint is written last, so its presence means the statement is complete.
+    Archived periods raise ArchivedPeriodError rather than yielding an empty
+    statement that looks balanced.
+    """
+    check_not_archived(period)
+    start, end = parse_period(period)
+    out_dir = period_dir(period, directory)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    data_path = out_dir / f"seller_{seller_id}.csv.gz"
+
+    opening = opening_balance(seller_id, period, directory)
+
+    rows = (
+        Transaction.objects.filter(seller_id=seller_id, created_at__gte=start, created_at__lt=end)
+        .order_by("created_at", "id")
+        .values_list("id", "created_at", "tx_type", "amount", "balance_after", "reference", "phone__number")
+        .iterator(chunk_size=FETCH_SIZE)
+    )
+
+    closing = opening
+    credits = debits = Decimal(0)
+    count = 0
+    with gzip.open(data_path, "wt", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(STATEMENT_COLUMNS)
+        for tx_id, created_at, tx_type, amount, balance_after, reference, number in rows:
+            writer.writerow([tx_id, created_at.isoformat(), tx_type, amount, balance_after, reference or "", number or ""])
+            if amount >= 0:
+                credits += amount
+            else:
+                debits += amount
+            closing = balance_after
+            count += 1
+
+    digest = hashlib.sha256(data_path.read_bytes()).hexdigest()
+    entry = {
+        "seller_id": seller_id,
+        "file": data_path.name,
+        "rows": count,
+        "opening_balance": str(opening),
+        "closing_balance": str(closing),
+        "credits": str(credits),
+        "debits": str(debits),
+        "balanced": opening + credits + debits == closing,
+        "sha256": digest,
+    }
+    _write_json_atomic(checkpoint_path(period, seller_id, directory), entry)
+    return entry
+
+
+def pending_sellers(period, seller_ids, directory=None):
+    return [pk for pk in seller_ids if not checkpoint_path(period, pk, directory).exists()]
+
+
+def build_chunk(period, seller_ids, directory=None):
+    """Build statements for ``seller_ids``, skipping sellers that already have a checkpoint."""
+    return [build_statement(pk, period, directory) for pk in pending_sellers(period, seller_ids, directory)]
+
+
+def write_manifest(period, directory=None):
+    """Combine the per-seller checkpoints of ``period`` into manifest.json."""
+    out_dir = period_dir(period, directory)
+    entries = []
+    for path in sorted(out_dir.glob("seller_*.json"), key=lambda p: int(p.stem.split("_")[1])):
+        with open(path, encoding="utf-8") as fh:
+            entries.append(json.load(fh))
+    start, end = parse_period(period)
+    manifest = {
+        "period": period,
+        "period_start": start.isoformat(),
+        "period_end": end.isoformat(),
+        "sellers": len(entries),
+        "rows": sum(entry["rows"] for entry in entries),
+        "unbalanced": [entry["seller_id"] for entry in entries if not entry["balanced"]],
+        "statements": entries,
+    }
+    _write_json_atomic(out_dir / "manifest.json", manifest)
+    return manifest
+
+
+def chunked(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _init_worker():
+    # Under the "spawn" start method the worker has to set Django up itself.
+    import django
+
+    django.setup()
+
+
+def run_statements(period, workers=4, chunk_size=100, seller_ids=None, directory=None, progress=None):
+    """Generate ``period`` statements for all sellers across a process pool.
+
+    Work is resumable: sellers with a checkpoint from an earlier (crashed) run
+    are not rebuilt. ``progress`` is called with each finished chunk's entries.
+    """
+    check_not_archived(period)
+    if seller_ids is None:
+        seller_ids = list(Seller.objects.order_by("pk").values_list("pk", flat=True))
+    todo = pending_sellers(period, seller_ids, directory)
+
+    if workers <= 1:
+        for chunk in chunked(todo, chunk_size):
+            entries = build_chunk(period, chunk, directory)
+            if progress:
+                progress(entries)
+    else:
+        # Forked workers must not share the parent's database connection.
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = [pool.submit(build_chunk, period, chunk, directory) for chunk in chunked(todo, chunk_size)]
+            for future in as_completed(futures):
+                entries = future.result()
+                if progress:
+                    progress(entries)
+
+    return write_manifest(period, directory)
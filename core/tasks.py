@@ -1,12 +1,75 @@
-from celery import shared_task
-from .models import sell_charge, InsufficientBalanceError
+from celery import chord, shared_task
+from . import contention
+from .alerts import deliver_pending
+from .feed import prune as prune_change_feed
+from .models import Seller, sell_charge, InsufficientBalanceError
+from .statements import build_chunk, check_not_archived, chunked, pending_sellers, write_manifest
+from .velocity import VelocityLimitExceeded, hit as velocity_hit, release as velocity_release
 
-@shared_task(bind=True, max_retries=3)
-def sell_charge_task(self, seller_id, phone_number, amount, reference=None, metadata=None):
+@shared_task(bind=True, max_retries=5)
+def sell_charge_task(self, seller_id, phone_number, amount, reference=None, metadata=None, velocity_receipt=None):
+    # Count the charge once and carry the receipt through retries; give it
+    # back if the charge finally fails, so only completed charges count.
+    if velocity_receipt is None:
+        try:
+            velocity_receipt = velocity_hit(seller_id, phone_number, amount)
+        except VelocityLimitExceeded as exc:
+            return {"seller_id": seller_id, "error": str(exc)}
     try:
         new_balance = sell_charge(seller_id, phone_number, amount, reference, metadata)
         return {"seller_id": seller_id, "new_balance": float(new_balance)}
     except InsufficientBalanceError:
+        velocity_release(velocity_receipt)
         return {"seller_id": seller_id, "error": "Insufficient balance"}
     except Exception as exc:
-        raise self.retry(exc=exc, countdown=5)
+        # Only lock contention and dropped connections are worth retrying.
+        kind = contention.classify(exc)
+        contention.record(kind, "sell_charge_task")
+        if kind == contention.PERMANENT or self.request.retries >= self.max_retries:
+            velocity_release(velocity_receipt)
+            raise
+        raise self.retry(
+            exc=exc,
+            countdown=contention.backoff_delay(self.request.retries),
+            kwargs={**(self.request.kwargs or {}), "velocity_receipt": velocity_receipt},
+        )
+
+
+@shared_task
+def build_statement_chunk_task(period, seller_ids):
+    return len(build_chunk(period, seller_ids))
+
+
+@shared_task
+def write_statement_manifest_task(results, period):
+    manifest = write_manifest(period)
+    return {"period": period, "sellers": manifest["sellers"], "unbalanced": manifest["unbalanced"]}
+
+
+@shared_task
+def generate_statements_task(period, chunk_size=100):
+    """Fan a month's statements out over the Celery workers, one task per chunk of sellers."""
+    check_not_archived(period)
+    seller_ids = list(Seller.objects.order_by("pk").values_list("pk", flat=True))
+    todo = pending_sellers(period, seller_ids)
+    if not todo:
+        return write_statement_manifest_task([], period)
+    header = [build_statement_chunk_task.s(period, chunk) for chunk in chunked(todo, chunk_size)]
+    chord(header)(write_statement_manifest_task.s(period))
+    return {"period": period, "chunks": len(header)}
+
+
+@shared_task
+def deliver_balance_alerts_task(batch_size=500, max_batches=20):
+    delivered = 0
+    for _ in range(max_batches):
+        count = deliver_pending(batch_size)
+        delivered += count
+        if count < batch_size:
+            break
+    return {"delivered": delivered}
+
+
+@shared_task
+def prune_change_feed_task():
+    return {"deleted": prune_change_feed()}
@@ -0,0 +1,22 @@
+from contextlib import contextmanager
+
+from .profiling import profile_queries
+
+
+class QueryBudgetMixin:
+    """TestCase mixin for declaring how many queries a code path may run.
+
+    Unlike ``assertNumQueries`` a budget is an upper bound, and a failure lists
+    duplicated statements (the usual N+1 signature) and the slowest ones.
+    """
+
+    @contextmanager
+    def assertQueryBudget(self, budget, label="block"):
+        with profile_queries(label) as profile:
+            yield profile
+        summary = profile.summary
+        if summary["query_count"] > budget:
+            lines = [f"{label} ran {summary['query_count']} queries, budget is {budget}"]
+            lines += [f"  x{item['count']}: {item['sql']}" for item in summary["duplicates"]]
+            lines += [f"  {item['ms']} ms: {item['sql']}" for item in summary["slowest"]]
+            self.fail("\n".join(lines))
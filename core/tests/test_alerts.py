@@ -0,0 +1,46 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from core.alerts import deliver_pending
+from core.models import BalanceAlert, Seller, TopUpRequest, sell_charge
+
+
+@override_settings(LOW_BALANCE_THRESHOLD=100, LOW_BALANCE_REARM_MARGIN=0.5, LOW_BALANCE_ALERT_COOLDOWN=timedelta(0))
+class LowBalanceAlertTests(TestCase):
+    def setUp(self):
+        self.seller = Seller.objects.create(name="Seller 1", balance=120)
+
+    def test_crossing_alerts_once_while_hovering(self):
+        sell_charge(self.seller.id, "09120000000", 30)  # 90: crosses
+        sell_charge(self.seller.id, "09120000000", 10)  # 80: still below
+        TopUpRequest.objects.create(seller=self.seller, amount=30).apply()  # 110: not re-armed yet
+        sell_charge(self.seller.id, "09120000000", 20)  # 90: no new alert
+        self.assertEqual(BalanceAlert.objects.filter(seller=self.seller).count(), 1)
+
+        TopUpRequest.objects.create(seller=self.seller, amount=70).apply()  # 160: re-armed
+        sell_charge(self.seller.id, "09120000000", 80)  # 80: crosses again
+        alerts = list(BalanceAlert.objects.filter(seller=self.seller).order_by("id"))
+        self.assertEqual([alert.balance for alert in alerts], [90, 80])
+
+    def test_per_seller_threshold_overrides_default(self):
+        Seller.objects.filter(pk=self.seller.pk).update(low_balance_threshold=50)
+        sell_charge(self.seller.id, "09120000000", 30)
+        self.assertFalse(BalanceAlert.objects.exists())
+        sell_charge(self.seller.id, "09120000000", 50)
+        self.assertEqual(BalanceAlert.objects.get().threshold, 50)
+
+    def test_delivery_in_batches(self):
+        other = Seller.objects.create(name="Seller 2", balance=120)
+        sell_charge(self.seller.id, "09120000000", 30)
+        sell_charge(other.id, "09120000000", 30)
+
+        backend = mock.Mock()
+        with override_settings(BALANCE_ALERT_BACKEND="core.tests.test_alerts.backend"), \
+                mock.patch("core.tests.test_alerts.backend", backend, create=True):
+            self.assertEqual(deliver_pending(batch_size=1), 1)
+            self.assertEqual(deliver_pending(batch_size=10), 1)
+            self.assertEqual(deliver_pending(batch_size=10), 0)
+        self.assertEqual(backend.call_count, 2)
+        self.assertFalse(BalanceAlert.objects.filter(delivered_at__isnull=True).exists())
@@ -0,0 +1,101 @@
+import gzip
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from pathlib import Path
+
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from core import partitions
+from core.archive import (
+    ArchiveIntegrityError, archive_partition, iter_archived_transactions, verify_archive, write_archive,
+)
+from core.models import Seller, Transaction, TransactionReference
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+class PartitionHelperTests(SimpleTestCase):
+    def test_month_arithmetic(self):
+        self.assertEqual(partitions.month_start(utc(2025, 9, 27, 7, 57)), utc(2025, 9, 1))
+        self.assertEqual(partitions.add_months(utc(2025, 11, 1), 3), utc(2026, 2, 1))
+        self.assertEqual(partitions.add_months(utc(2025, 1, 1), -1), utc(2024, 12, 1))
+        self.assertEqual(partitions.partition_name(utc(2025, 3, 1)), "core_transaction_p2025_03")
+        self.assertEqual(
+            list(partitions.month_range(utc(2025, 11, 15), utc(2026, 1, 2))),
+            [utc(2025, 11, 1), utc(2025, 12, 1), utc(2026, 1, 1)],
+        )
+
+
+class ArchiveTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp.name)
+        rows = [
+            (1, 7, "TOPUP", Decimal("1000"), Decimal("1000"), None, "topup:a", {"applied_by": "ops"}, utc(2025, 1, 3)),
+            (2, 7, "SALE", Decimal("-5"), Decimal("995"), 3, "sale:1", {"phone_number": "0912"}, utc(2025, 1, 4)),
+            (3, 8, "SALE", Decimal("-5"), Decimal("45"), 3, "sale:2", None, utc(2025, 1, 30)),
+        ]
+        self.manifest = write_archive(
+            self.directory, "core_transaction_p2025_01", rows, utc(2025, 1, 1), utc(2025, 2, 1)
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_roundtrip(self):
+        self.assertEqual(self.manifest["row_count"], 3)
+        txs = list(iter_archived_transactions(directory=self.directory, seller_id=7))
+        self.assertEqual([tx["id"] for tx in txs], [1, 2])
+        self.assertEqual(txs[1]["amount"], Decimal("-5"))
+        self.assertEqual(txs[1]["metadata"], {"phone_number": "0912"})
+        self.assertIsNone(txs[0]["phone_id"])
+
+    def test_range_filter_skips_other_periods(self):
+        txs = list(iter_archived_transactions(start=utc(2025, 1, 4), end=utc(2025, 1, 5), directory=self.directory))
+        self.assertEqual([tx["id"] for tx in txs], [2])
+        self.assertEqual(list(iter_archived_transactions(start=utc(2025, 2, 1), directory=self.directory)), [])
+
+    def test_checksum_mismatch_is_detected(self):
+        with gzip.open(self.directory / self.manifest["file"], "at") as fh:
+            fh.write("4,7,SALE,-1,1,,,,2025-01-05T00:00:00+00:00\r\n")
+        with self.assertRaises(ArchiveIntegrityError):
+            verify_archive(self.directory / "core_transaction_p2025_01.manifest.json")
+
+
+class ArchivePartitionTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp.name)
+        partitions.ensure_partitions(utc(2024, 1, 1), utc(2024, 1, 1))
+        seller = Seller.objects.create(name="Seller 1", balance=10)
+        self.tx = Transaction.objects.create(
+            seller=seller, tx_type=Transaction.TOPUP, amount=10, balance_after=10, reference="topup:old"
+        )
+        Transaction.objects.filter(pk=self.tx.pk).update(created_at=utc(2024, 1, 10))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_archives_then_drops(self):
+        manifest = archive_partition("core_transaction_p2024_01", utc(2024, 1, 1), directory=self.directory)
+
+        self.assertEqual(manifest["row_count"], 1)
+        self.assertFalse(Transaction.objects.filter(pk=self.tx.pk).exists())
+        self.assertNotIn("core_transaction_p2024_01", dict(partitions.list_partitions()))
+        self.assertFalse(TransactionReference.objects.filter(reference="topup:old").exists())
+        self.assertEqual([tx["id"] for tx in iter_archived_transactions(directory=self.directory)], [self.tx.pk])
+
+    def test_failed_verification_keeps_partition_attached(self):
+        with mock.patch("core.archive.verify_archive", side_effect=ArchiveIntegrityError("bad")):
+            with self.assertRaises(ArchiveIntegrityError):
+                archive_partition("core_transaction_p2024_01", utc(2024, 1, 1), directory=self.directory)
+
+        self.assertTrue(Transaction.objects.filter(pk=self.tx.pk).exists())
+        self.assertIn("core_transaction_p2024_01", dict(partitions.list_partitions()))
+        self.assertTrue(TransactionReference.objects.filter(reference="topup:old").exists())
+        self.assertEqual(list(self.directory.iterdir()), [])
@@ -0,0 +1,66 @@
+from unittest import mock
+
+from django.db import DatabaseError, IntegrityError, OperationalError
+from django.test import SimpleTestCase
+
+from core import contention
+from core.models import InsufficientBalanceError, Seller
+from core.tasks import sell_charge_task
+
+
+def db_error(cls, pgcode):
+    cause = Exception("driver error")
+    cause.pgcode = pgcode
+    exc = cls("wrapped")
+    exc.__cause__ = cause
+    return exc
+
+
+class ClassifyTests(SimpleTestCase):
+    def test_transient_sqlstates(self):
+        self.assertEqual(contention.classify(db_error(OperationalError, "40P01")), contention.DEADLOCK)
+        self.assertEqual(contention.classify(db_error(OperationalError, "40001")), contention.SERIALIZATION)
+        self.assertEqual(contention.classify(db_error(OperationalError, "55P03")), contention.LOCK_TIMEOUT)
+        self.assertEqual(contention.classify(OperationalError("server closed the connection")), contention.CONNECTION)
+
+    def test_permanent_errors(self):
+        self.assertEqual(contention.classify(db_error(IntegrityError, "23505")), contention.PERMANENT)
+        self.assertEqual(contention.classify(db_error(DatabaseError, "42P01")), contention.PERMANENT)
+        self.assertEqual(contention.classify(ValueError("bad amount")), contention.PERMANENT)
+        self.assertEqual(contention.classify(Seller.DoesNotExist()), contention.PERMANENT)
+
+    def test_backoff_is_jittered_and_capped(self):
+        delays = [contention.backoff_delay(10, base=0.5, cap=4) for _ in range(200)]
+        self.assertTrue(all(0 <= d <= 4 for d in delays))
+        self.assertGreater(len(set(delays)), 1)
+        self.assertLessEqual(contention.backoff_delay(0, base=0.5, cap=4), 0.5)
+
+
+class SellChargeTaskRetryTests(SimpleTestCase):
+    @mock.patch("core.tasks.velocity_hit")
+    def test_only_transient_failures_are_retried(self, _velocity):
+        with mock.patch("core.tasks.sell_charge", side_effect=db_error(OperationalError, "55P03")), \
+                mock.patch.object(sell_charge_task, "retry", side_effect=RuntimeError("retry")) as retry:
+            with self.assertRaisesMessage(RuntimeError, "retry"):
+                sell_charge_task.run(1, "0912", 5)
+        self.assertLessEqual(retry.call_args.kwargs["countdown"], 0.5)
+
+        with mock.patch("core.tasks.sell_charge", side_effect=Seller.DoesNotExist()), \
+                mock.patch.object(sell_charge_task, "retry") as retry:
+            with self.assertRaises(Seller.DoesNotExist):
+                sell_charge_task.run(1, "0912", 5)
+        retry.assert_not_called()
+
+    @mock.patch("core.tasks.velocity_release")
+    @mock.patch("core.tasks.velocity_hit", return_value={"store": "memory", "counted": []})
+    def test_failed_charges_give_back_theirhit_count(self, hit, release):
+        with mock.patch("core.tasks.sell_charge", side_effect=db_error(OperationalError, "55P03")), \
+                mock.patch.object(sell_charge_task, "retry", side_effect=RuntimeError("retry")) as retry:
+            with self.assertRaisesMessage(RuntimeError, "retry"):
+                sell_charge_task.run(1, "0912", 5)
+        release.assert_not_called()
+        self.assertEqual(retry.call_args.kwargs["kwargs"]["velocity_receipt"], hit.return_value)
+
+        with mock.patch("core.tasks.sell_charge", side_effect=InsufficientBalanceError()):
+            sell_charge_task.run(1, "0912", 5)
+        release.assert_called_once_with(hit.return_value)
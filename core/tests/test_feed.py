@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import feed
+from core.models import ChangeEvent, Seller, TopUpRequest, sell_charge
+
+
+# Events are only served once their transaction has committed, so these tests
+# cannot run inside TestCase's wrapping transaction.
+class ChangeFeedTests(TransactionTestCase):
+    def setUp(self):
+        self.seller = Seller.objects.create(name="Seller 1", balance=0)
+        self.topup = TopUpRequest.objects.create(seller=self.seller, amount=100)
+        self.topup.apply(approver="ops")
+        sell_charge(self.seller.id, "09120000000", 10)
+
+    def test_events_in_order_and_resume_from_offset(self):
+        events = feed.fetch()
+        self.assertEqual(
+            [(e.source, e.op) for e in events],
+            [
+                (ChangeEvent.TOPUP_REQUEST, "INSERT"),
+                (ChangeEvent.TRANSACTION, "INSERT"),
+                (ChangeEvent.TOPUP_REQUEST, "UPDATE"),
+                (ChangeEvent.TRANSACTION, "INSERT"),
+            ],
+        )
+        self.assertEqual(events[-1].payload["balance_after"], 90)
+
+        feed.ack("bi", (events[1].txid, events[1].pk))
+        resumed = feed.fetch(feed.consumer_cursor("bi"))
+        self.assertEqual([e.pk for e in resumed], [e.pk for e in events[2:]])
+
+        # Offsets never move backwards.
+        self.assertEqual(feed.ack("bi", (0, 0)), (events[1].txid, events[1].pk))
+
+    def test_long_poll_times_out_with_no_new_events(self):
+        events = feed.fetch()
+        last = (events[-1].txid, events[-1].pk)
+        self.assertEqual(feed.long_poll(last, wait=0.2), [])
+
+    def test_prune_keeps_unacknowledged_events(self):
+        events = feed.fetch()
+        feed.ack("bi", (events[-1].txid, events[-1].pk))
+        feed.ack("accounting", (events[0].txid, events[0].pk))
+        feed.prune()
+        self.assertEqual(len(feed.fetch(feed.consumer_cursor("accounting"))), 3)
+
+    def test_prune_enforces_retention_without_consumers(self):
+        events = feed.fetch()
+        ChangeEvent.objects.filter(pk__in=[e.pk for e in events[:2]]).update(
+            created_at=timezone.now() - timedelta(days=30)
+        )
+        self.assertEqual(feed.prune(batch_size=1), 2)
+        self.assertEqual([e.pk for e in feed.fetch()], [e.pk for e in events[2:]])
+
+    def test_api_rejects_non_finite_wait(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user("admin", is_staff=True))
+        for wait in ("nan", "inf"):
+            response = client.get("/api/feed/", {"wait": wait})
+            self.assertEqual(response.status_code, 400, wait)
+        self.assertEqual(client.get("/api/feed/", {"wait": "0"}).status_code, 200)
@@ -0,0 +1,62 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+
+from core import partitions
+from core.models import Seller, Transaction, TransactionReference
+
+
+class ReferenceUniquenessTests(TestCase):
+    def setUp(self):
+        self.seller = Seller.objects.create(name="Seller 1", balance=1000)
+
+    def create(self, reference):
+        return Transaction.objects.create(
+            seller=self.seller, tx_type=Transaction.ADJUST, amount=1, balance_after=1001, reference=reference
+        )
+
+    def test_reference_is_unique_across_partitions(self):
+        tx = self.create("ref-1")
+        Transaction.objects.filter(pk=tx.pk).update(created_at=datetime(2025, 1, 15, tzinfo=dt_timezone.utc))
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.create("ref-1")
+
+        self.assertEqual(Transaction.objects.filter(reference="ref-1").count(), 1)
+        self.assertEqual(TransactionReference.objects.get(reference="ref-1").transaction_id, tx.pk)
+
+    def test_get_or_create_by_reference_is_idempotent(self):
+        tx = self.create("ref-2")
+        Transaction.objects.filter(pk=tx.pk).update(created_at=datetime(2025, 1, 15, tzinfo=dt_timezone.utc))
+
+        found, created = Transaction.objects.get_or_create(
+            reference="ref-2",
+            defaults={"seller": self.seller, "tx_type": Transaction.ADJUST, "amount": 1, "balance_after": 1001},
+        )
+        self.assertFalse(created)
+        self.assertEqual(found.pk, tx.pk)
+
+
+class EnsurePartitionsTests(TestCase):
+    def test_moves_rows_out_of_the_default_partition(self):
+        seller = Seller.objects.create(name="Seller 1", balance=1000)
+        tx = Transaction.objects.create(
+            seller=seller, tx_type=Transaction.ADJUST, amount=1, balance_after=1001, reference="future"
+        )
+        Transaction.objects.filter(pk=tx.pk).update(created_at=datetime(2031, 3, 5, tzinfo=dt_timezone.utc))
+        self.assertEqual(self.partition_of(tx.pk), partitions.DEFAULT_PARTITION)
+
+        ensured, failed = partitions.ensure_partitions(
+            datetime(2031, 2, 1, tzinfo=dt_timezone.utc), datetime(2031, 4, 1, tzinfo=dt_timezone.utc)
+        )
+
+        self.assertEqual(failed, {})
+        self.assertEqual(ensured, ["core_transaction_p2031_02", "core_transaction_p2031_03", "core_transaction_p2031_04"])
+        self.assertEqual(self.partition_of(tx.pk), "core_transaction_p2031_03")
+        self.assertEqual(Transaction.objects.get(reference="future").pk, tx.pk)
+
+    def partition_of(self, pk):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT tableoid::regclass::text FROM core_transaction WHERE id = %s", [pk])
+            return cursor.fetchone()[0]
@@ -0,0 +1,82 @@
+from celery.signals import task_postrun, task_prerun
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from core.models import PhoneNumber, Seller, sell_charge
+from core.profiling import clear_profiles, connect_celery_signals, profile_queries, recent_profiles
+from core.tasks import deliver_balance_alerts_task
+from core.testing import QueryBudgetMixin
+from core.velocity import reset_checker
+
+
+@override_settings(VELOCITY_REDIS_URL=None)
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        reset_checker()
+        self.addCleanup(reset_checker)
+        self.client = APIClient()
+        self.seller = Seller.objects.create(name="Seller 1", balance=10000)
+        for i in range(10):
+            sell_charge(self.seller.id, f"0912000{i}", 5, metadata={"order_id": str(i)})
+
+    def test_transaction_list(self):
+        with self.assertQueryBudget(2, "transaction-list"):
+            response = self.client.get("/api/transactions/", {"page_size": 10})
+        self.assertEqual(response.status_code, 200)
+
+    def test_transaction_search(self):
+        # EXPLAIN for the estimate, exact COUNT(*) for a small result, page fetch.
+        with self.assertQueryBudget(3, "transaction-search"):
+            response = self.client.get("/api/transactions/search/", {"phone": "09120001"})
+        self.assertEqual(response.status_code, 200)
+
+    def test_sell_charge(self):
+        PhoneNumber.objects.create(name="p", number="09350000000")
+        with self.assertQueryBudget(10, "sell-charge"):
+            response = self.client.post(
+                "/api/sell_charge/",
+                {"seller_id": self.seller.id, "phone_number": "09350000000", "amount": 5},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 202)
+
+    def test_profile_reports_duplicates(self):
+        with profile_queries("dupes") as profile:
+            for _ in range(3):
+                Seller.objects.filter(pk=self.seller.pk).exists()
+        self.assertEqual(profile.summary["query_count"], 3)
+        self.assertEqual(profile.summary["duplicates"][0]["count"], 3)
+
+
+@override_settings(SQL_PROFILING_ENABLED=True)
+class SQLProfilingRuntimeTests(TestCase):
+    def setUp(self):
+        clear_profiles()
+        self.addCleanup(clear_profiles)
+        connect_celery_signals()
+        self.addCleanup(task_prerun.disconnect, dispatch_uid="core.profiling.prerun")
+        self.addCleanup(task_postrun.disconnect, dispatch_uid="core.profiling.postrun")
+        # A fresh client builds its middleware chain under the overridden setting.
+        self.client = APIClient()
+
+    def test_requests_and_tasks_are_profiled(self):
+        self.assertEqual(self.client.get("/api/transactions/").status_code, 200)
+        deliver_balance_alerts_task.delay()
+
+        labels = [profile["label"] for profile in recent_profiles()]
+        self.assertIn("view:transaction-list", labels)
+        self.assertIn("task:core.tasks.deliver_balance_alerts_task", labels)
+        task = [p for p in recent_profiles() if p["label"] == "task:core.tasks.deliver_balance_alerts_task"][0]
+        self.assertGreaterEqual(task["query_count"], 1)
+
+    def test_profiles_endpoint_is_admin_only(self):
+        self.assertIn(self.client.get("/api/profiling/sql/").status_code, (401, 403))
+
+        self.client.force_authenticate(User.objects.create_user("staff", is_staff=True))
+        response = self.client.get("/api/profiling/sql/", {"label": "view:transaction-list"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count"], 0)
+        self.client.get("/api/transactions/")
+        response = self.client.get("/api/profiling/sql/", {"label": "view:transaction-list"})
+        self.assertEqual(response.json()["count"], 1)
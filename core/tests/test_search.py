@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+from django.contrib.admin.sites import site
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import Seller, Transaction, sell_charge
+
+
+class TransactionSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.seller = Seller.objects.create(name="Seller 1", balance=1000)
+        sell_charge(self.seller.id, "09120000001", 10, metadata={"order_id": "A1"})
+        sell_charge(self.seller.id, "09120000001", 50, metadata={"order_id": "A2"})
+        sell_charge(self.seller.id, "09350000002", 20, metadata={"order_id": "A3"})
+
+    def search(self, **params):
+        response = self.client.get("/api/transactions/search/", params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_filter_by_phone_and_amount(self):
+        data = self.search(phone="09120000001")
+        self.assertEqual(data["count"], 2)
+        self.assertFalse(data["count_is_estimate"])
+
+        data = self.search(phone="09120000001", amount_max=-20)
+        self.assertEqual([tx["amount"] for tx in data["results"]], ["-50"])
+
+        data = self.search(phone_prefix="0935")
+        self.assertEqual(data["results"][0]["phone"]["number"], "09350000002")
+
+    def test_filter_by_metadata_and_date(self):
+        data = self.search(metadata="order_id:A2")
+        self.assertEqual(data["count"], 1)
+        self.assertEqual(data["results"][0]["metadata"]["order_id"], "A2")
+
+        Transaction.objects.filter(metadata__contains={"order_id": "A1"}).update(
+            created_at=timezone.now() - timedelta(days=10)
+        )
+        since = (timezone.now() - timedelta(days=7)).isoformat()
+        data = self.search(created_after=since)
+        self.assertEqual(data["count"], 2)
+
+    def test_malformed_metadata_filter(self):
+        response = self.client.get("/api/transactions/search/", {"metadata": "order_id"})
+        self.assertEqual(response.status_code, 400)
+
+
+class TransactionAdminSearchTests(TestCase):
+    def setUp(self):
+        self.seller = Seller.objects.create(name="Seller 1", balance=1000)
+        sell_charge(self.seller.id, "09120000001", 10, reference="order-17")
+        sell_charge(self.seller.id, "09350000002", 20)
+        self.model_admin = site._registry[Transaction]
+        self.request = RequestFactory().get("/admin/core/transaction/")
+
+    def search(self, term):
+        queryset, _ = self.model_admin.get_search_results(self.request, Transaction.objects.all(), term)
+        self.assertNotIn(" OR ", str(queryset.query))
+        return queryset
+
+    def test_phone_number_or_reference_not_both(self):
+        self.assertEqual([tx.phone.number for tx in self.search("09350000002")], ["09350000002"])
+        self.assertEqual([tx.reference for tx in self.search(" order-17 ")], ["order-17"])
+        self.assertEqual(self.search("").count(), 2)
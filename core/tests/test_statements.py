@@ -0,0 +1,93 @@
+import gzip
+import json
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+
+from core.archive import write_archive
+from core.models import Seller, Transaction, sell_charge
+from core.statements import ArchivedPeriodError, build_statement, checkpoint_path, run_statements
+
+
+class StatementTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp.name)
+        self.seller = Seller.objects.create(name="Seller 1", balance=1000)
+        self.idle = Seller.objects.create(name="Seller 2", balance=70)
+        for i in range(4):
+            sell_charge(self.seller.id, f"0912000{i}", 10)
+        # Move the first sale into the previous month so it only affects the opening balance.
+        first = Transaction.objects.filter(seller=self.seller).order_by("id").first()
+        Transaction.objects.filter(pk=first.pk).update(created_at=datetime(2025, 8, 31, tzinfo=dt_timezone.utc))
+        Transaction.objects.filter(seller=self.seller).exclude(pk=first.pk).update(
+            created_at=datetime(2025, 9, 15, tzinfo=dt_timezone.utc)
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_opening_and_closing_balances(self):
+        entry = build_statement(self.seller.id, "2025-09", self.directory)
+        self.assertEqual(entry["rows"], 3)
+        self.assertEqual(entry["opening_balance"], "990")
+        self.assertEqual(entry["closing_balance"], "960")
+        self.assertEqual(Decimal(entry["debits"]), Decimal(-30))
+        self.assertTrue(entry["balanced"])
+        with gzip.open(self.directory / "2025-09" / entry["file"], "rt") as fh:
+            self.assertEqual(len(fh.read().splitlines()), 4)
+
+    def test_run_resumes_from_checkpoints(self):
+        build_statement(self.seller.id, "2025-09", self.directory)
+        checkpoint = self.directory / "2025-09" / f"seller_{self.seller.id}.json"
+        before = checkpoint.stat().st_mtime_ns
+
+        manifest = run_statements("2025-09", workers=1, directory=self.directory)
+
+        self.assertEqual(checkpoint.stat().st_mtime_ns, before)
+        self.assertEqual(manifest["sellers"], 2)
+        self.assertEqual(manifest["unbalanced"], [])
+        with open(self.directory / "2025-09" / "manifest.json") as fh:
+            idle = [s for s in json.load(fh)["statements"] if s["seller_id"] == self.idle.id][0]
+        self.assertEqual(idle["rows"], 0)
+
+    def test_opening_balance_falls_back_to_previous_checkpoint(self):
+        previous = checkpoint_path("2025-08", self.idle.id, self.directory)
+        previous.parent.mkdir(parents=True)
+        previous.write_text(json.dumps({"closing_balance": "70"}))
+
+        entry = build_statement(self.idle.id, "2025-09", self.directory)
+
+        self.assertEqual(entry["opening_balance"], "70")
+        self.assertTrue(entry["balanced"])
+
+    def test_opening_balance_falls_back_to_archive(self):
+        archive = self.directory / "archive"
+        rows = [
+            (1, self.idle.id, "TOPUP", Decimal(100), Decimal(100), None, "topup:x", None,
+             datetime(2025, 6, 2, tzinfo=dt_timezone.utc)),
+            (2, self.idle.id, "SALE", Decimal(-30), Decimal(70), None, "sale:x", None,
+             datetime(2025, 6, 3, tzinfo=dt_timezone.utc)),
+        ]
+        write_archive(archive, "core_transaction_p2025_06", rows,
+                      datetime(2025, 6, 1, tzinfo=dt_timezone.utc), datetime(2025, 7, 1, tzinfo=dt_timezone.utc))
+
+        with override_settings(TRANSACTION_ARCHIVE_DIR=archive):
+            entry = build_statement(self.idle.id, "2025-09", self.directory)
+
+        self.assertEqual(entry["opening_balance"], "70")
+
+    def test_archived_period_is_refused(self):
+        archive = self.directory / "archive"
+        write_archive(archive, "core_transaction_p2025_09", [],
+                      datetime(2025, 9, 1, tzinfo=dt_timezone.utc), datetime(2025, 10, 1, tzinfo=dt_timezone.utc))
+
+        with override_settings(TRANSACTION_ARCHIVE_DIR=archive):
+            with self.assertRaises(ArchivedPeriodError):
+                build_statement(self.seller.id, "2025-09", self.directory)
+            with self.assertRaises(ArchivedPeriodError):
+                run_statements("2025-09", workers=1, directory=self.directory)
+        self.assertFalse(checkpoint_path("2025-09", self.seller.id, self.directory).exists())
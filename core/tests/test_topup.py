@@ -1,6 +1,8 @@
-from django.test import TestCase
+from django.contrib.admin.sites import site
+from django.contrib.auth.models import Permission, User
+from django.test import RequestFactory, TestCase
 from decimal import Decimal
-from core.models import Seller, sell_charge
+from core.models import Seller, TopUpRequest, Transaction, sell_charge
 import concurrent.futures
 
 class SellChargeTests(TestCase):
@@ -40,4 +42,60 @@ class SellChargeTests(TestCase):
         self.seller1.refresh_from_db()
         print("[RESULT] Final balance after parallel sales:", self.seller1.balance)
 
+
+class TopUpBulkApplyTests(TestCase):
+    def test_bulk_apply_skips_applied_and_keeps_running_balance(self):
+        seller1 = Seller.objects.create(name="Seller 1", balance=100)
+        seller2 = Seller.objects.create(name="Seller 2", balance=0)
+        requests = [
+            TopUpRequest.objects.create(seller=seller1, amount=10),
+            TopUpRequest.objects.create(seller=seller1, amount=20),
+            TopUpRequest.objects.create(seller=seller2, amount=5),
+        ]
+        requests[0].apply(approver="ops")
+
+        applied = TopUpRequest.apply_bulk([tr.pk for tr in requests], approver="admin")
+
+        self.assertEqual(applied, 2)
+        seller1.refresh_from_db()
+        seller2.refresh_from_db()
+        self.assertEqual(seller1.balance, Decimal(130))
+        self.assertEqual(seller2.balance, Decimal(5))
+        self.assertEqual(
+            list(Transaction.objects.filter(seller=seller1).order_by("id").values_list("balance_after", flat=True)),
+            [Decimal(110), Decimal(130)],
+        )
+        self.assertFalse(TopUpRequest.objects.filter(applied_at__isnull=True).exists())
+        self.assertEqual(TopUpRequest.apply_bulk([tr.pk for tr in requests]), 0)
+
+
+class TopUpAdminTests(TestCase):
+    def setUp(self):
+        self.model_admin = site._registry[TopUpRequest]
+        self.user = User.objects.create_user("staff", is_staff=True)
+        self.user.user_permissions.add(
+            Permission.objects.get(codename="view_topuprequest"),
+            Permission.objects.get(codename="change_topuprequest"),
+        )
+
+    def request(self):
+        request = RequestFactory().get("/admin/core/topuprequest/")
+        request.user = User.objects.get(pk=self.user.pk)
+        return request
+
+    def test_apply_action_requires_approve_permission(self):
+        self.assertNotIn("apply_selected", self.model_admin.get_actions(self.request()))
+
+        self.user.user_permissions.add(Permission.objects.get(codename="approve_topuprequest"))
+        self.assertIn("apply_selected", self.model_admin.get_actions(self.request()))
+
+    def test_applied_topup_keeps_seller_and_amount(self):
+        tr = TopUpRequest.objects.create(seller=Seller.objects.create(name="Seller 1"), amount=10)
+        self.assertNotIn("amount", self.model_admin.get_readonly_fields(self.request(), tr))
+
+        tr.apply(approver="ops")
+        readonly = self.model_admin.get_readonly_fields(self.request(), tr)
+        self.assertIn("seller", readonly)
+        self.assertIn("amount", readonly)
+
 # docker-compose exec django python manage.py test core.tests.test_topup --keepdb -v 2 --debug-mode
\ No newline at end of file
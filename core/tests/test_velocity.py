@@ -0,0 +1,68 @@
+from unittest import mock
+
+import redis
+from django.test import SimpleTestCase
+
+from core.velocity import Rule, VelocityChecker, VelocityLimitExceeded
+
+
+class VelocityCheckerTests(SimpleTestCase):
+    def setUp(self):
+        self.rules = [
+            Rule("phone-hourly", "phone", 3600, 3),
+            Rule("seller-amount", "seller", 3600, 100, measure="amount"),
+        ]
+
+    def test_limits_per_phone_and_seller(self):
+        checker = VelocityChecker(self.rules)
+        for _ in range(3):
+            checker.evaluate(1, "0912", 10, consume=True)
+        with self.assertRaises(VelocityLimitExceeded) as ctx:
+            checker.evaluate(2, "0912", 10, consume=True)
+        self.assertEqual(ctx.exception.rule.name, "phone-hourly")
+
+        checker.evaluate(1, "0935", 60, consume=True)
+        with self.assertRaises(VelocityLimitExceeded) as ctx:
+            checker.evaluate(1, "0936", 20, consume=True)
+        self.assertEqual(ctx.exception.rule.name, "seller-amount")
+
+    def test_check_does_not_count_and_rejected_hits_count_nothing(self):
+        checker = VelocityChecker(self.rules)
+        for _ in range(5):
+            checker.evaluate(1, "0912", 10, consume=False)
+        checker.evaluate(1, "0912", 95, consume=True)
+        with self.assertRaises(VelocityLimitExceeded):
+            checker.evaluate(1, "0912", 10, consume=True)
+        # The rejected hit must not have consumed the phone rule's budget.
+        checker.evaluate(2, "0912", 1, consume=True)
+
+    def test_released_charges_do_not_count(self):
+        checker = VelocityChecker(self.rules)
+        for _ in range(3):
+            receipt = checker.evaluate(1, "0912", 10, consume=True)
+            checker.release(receipt)
+        self.assertIsNone(checker.evaluate(1, "0912", 10, consume=False))
+        for _ in range(3):
+            checker.evaluate(1, "0912", 10, consume=True)
+        with self.assertRaises(VelocityLimitExceeded):
+            checker.evaluate(1, "0912", 10, consume=True)
+
+    def test_previous_window_is_weighted(self):
+        checker = VelocityChecker([Rule("phone-hourly", "phone", 3600, 3)])
+        with mock.patch("core.velocity.time.time", return_value=3600 * 10 - 1):
+            for _ in range(3):
+                checker.evaluate(1, "0912", 1, consume=True)
+        with mock.patch("core.velocity.time.time", return_value=3600 * 10 + 60):
+            with self.assertRaises(VelocityLimitExceeded):
+                checker.evaluate(1, "0912", 1, consume=True)
+        with mock.patch("core.velocity.time.time", return_value=3600 * 10 + 1800):
+            checker.evaluate(1, "0912", 1, consume=True)
+
+    def test_unavailable_redis_falls_back_to_memory(self):
+        checker = VelocityChecker(self.rules, redis_url="redis://127.0.0.1:1/0")
+        checker.redis.script = mock.Mock(side_effect=redis.ConnectionError("down"))
+        for _ in range(3):
+            checker.evaluate(1, "0912", 1, consume=True)
+        with self.assertRaises(VelocityLimitExceeded):
+            checker.evaluate(1, "0912", 1, consume=True)
+        self.assertEqual(checker.redis.script.call_count, 1)
@@ -1,6 +1,9 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import SellerViewSet, TransactionViewSet, TopUpRequestViewSet, sell_charge_api
+from .views import (
+    SellerViewSet, TransactionViewSet, TopUpRequestViewSet, sell_charge_api,
+    sql_profiles_api, contention_stats_api, change_feed_api, change_feed_ack_api,
+)
 
 router = DefaultRouter()
 router.register(r"sellers", SellerViewSet, basename="seller")
@@ -10,4 +13,8 @@ router.register(r"topups", TopUpRequestViewSet, basename="topup")
 urlpatterns = [
     path("", include(router.urls)),
     path("sell_charge/", sell_charge_api, name="sell-charge"),
+    path("profiling/sql/", sql_profiles_api, name="sql-profiles"),
+    path("profiling/contention/", contention_stats_api, name="contention-stats"),
+    path("feed/", change_feed_api, name="change-feed"),
+    path("feed/ack/", change_feed_ack_api, name="change-feed-ack"),
 ]
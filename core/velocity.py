@@ -0,0 +1,245 @@
+"""Sliding-window velocity limits for the charge path.
+
+Rules are declared in ``settings.VELOCITY_RULES``::
+
+    {"name": "phone-hourly", "scope": "phone", "window": 3600, "limit": 5}
+    {"name": "seller-hourly-amount", "scope": "seller", "window": 3600,
+     "limit": 10**9, "measure": "amount"}
+
+Each rule keeps two fixed-window counters per key (current and previous
+window) and estimates the sliding window as ``prev * overlap + curr``, so a
+check is O(1) regardless of volume. Counters live in Redis and are checked
+and incremented for all rules in one Lua script; when Redis is unreachable a
+per-process in-memory store is used instead so charges are never blocked.
+
+Rules limit completed charges: ``hit`` counts a charge before it runs and
+returns a receipt, and a charge that then fails is given back with
+``release(receipt)``.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+try:
+    import redis
+except ImportError:  # pragma: no cover
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+SCOPES = ("phone", "seller")
+MEASURES = ("count", "amount")
+
+CHECK_AND_HIT = """
+local n = tonumber(ARGV[2])
+for i = 1, n do
+    local base = 2 + (i - 1) * 4
+    local curr = tonumber(redis.call('GET', KEYS[2 * i - 1]) or '0')
+    local prev = tonumber(redis.call('GET', KEYS[2 * i]) or '0')
+    if prev * tonumber(ARGV[base + 3]) + curr + tonumber(ARGV[base + 2]) > tonumber(ARGV[base + 1]) then
+        return i
+    end
+end
+if ARGV[1] == 'hit' then
+    for i = 1, n do
+        local base = 2 + (i - 1) * 4
+        redis.call('INCRBY', KEYS[2 * i - 1], ARGV[base + 2])
+        redis.call('EXPIRE', KEYS[2 * i - 1], ARGV[base + 4])
+    end
+end
+return 0
+"""
+
+RELEASE = """
+for i, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 and redis.call('DECRBY', key, ARGV[i]) <= 0 then
+        redis.call('DEL', key)
+    end
+end
+return 0
+"""
+
+
+class VelocityLimitExceeded(Exception):
+    def __init__(self, rule):
+        super().__init__(f"Velocity limit exceeded: {rule.name}")
+        self.rule = rule
+
+
+class Rule:
+    def __init__(self, name, scope, window, limit, measure="count"):
+        if scope not in SCOPES:
+            raise ValueError(f"Unknown velocity scope {scope!r}")
+        if measure not in MEASURES:
+            raise ValueError(f"Unknown velocity measure {measure!r}")
+        self.name = name
+        self.scope = scope
+        self.window = int(window)
+        self.limit = int(limit)
+        self.measure = measure
+
+    def identity(self, seller_id, phone_number):
+        return phone_number if self.scope == "phone" else str(seller_id)
+
+    def cost(self, amount):
+        return 1 if self.measure == "count" else int(amount)
+
+
+def _entries(rules, seller_id, phone_number, amount, now):
+    """Yield (rule, current key, previous key, cost, previous-window weight, ttl)."""
+    for rule in rules:
+        index = int(now // rule.window)
+        prefix = f"velocity:{rule.name}:{rule.identity(seller_id, phone_number)}"
+        weight = 1 - (now % rule.window) / rule.window
+        yield rule, f"{prefix}:{index}", f"{prefix}:{index - 1}", rule.cost(amount), weight, rule.window * 2
+
+
+class MemoryStore:
+    """Per-process fallback counters; only as accurate as a single worker's view."""
+
+    max_keys = 100000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+
+    def evaluate(self, entries, consume, now):
+        with self._lock:
+            if len(self._counters) > self.max_keys:
+                self._counters = {k: v for k, v in self._counters.items() if v[1] > now}
+            for rule, curr_key, prev_key, cost, weight, _ in entries:
+                curr = self._get(curr_key, now)
+                prev = self._get(prev_key, now)
+                if prev * weight + curr + cost > rule.limit:
+                    return rule
+            if consume:
+                for _, curr_key, _, cost, _, ttl in entries:
+                    self._counters[curr_key] = (self._get(curr_key, now) + cost, now + ttl)
+        return None
+
+    def release(self, counted, now):
+        with self._lock:
+            for key, cost in counted:
+                value = self._counters.get(key)
+                if value and value[1] > now:
+                    self._counters[key] = (max(value[0] - cost, 0), value[1])
+
+    def _get(self, key, now):
+        value = self._counters.get(key)
+        return value[0] if value and value[1] > now else 0
+
+
+class RedisStore:
+    def __init__(self, url):
+        timeout = getattr(settings, "VELOCITY_REDIS_TIMEOUT", 0.05)
+        self.client = redis.Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+        self.script = self.client.register_script(CHECK_AND_HIT)
+        self.release_script = self.client.register_script(RELEASE)
+
+    def evaluate(self, entries, consume, now):
+        keys = []
+        args = ["hit" if consume else "check", len(entries)]
+        for rule, curr_key, prev_key, cost, weight, ttl in entries:
+            keys += [curr_key, prev_key]
+            args += [rule.limit, cost, weight, ttl]
+        violated = int(self.script(keys=keys, args=args))
+        return entries[violated - 1][0] if violated else None
+
+    def release(self, counted, now):
+        self.release_script(keys=[key for key, _ in counted], args=[cost for _, cost in counted])
+
+
+class VelocityChecker:
+    def __init__(self, rules, redis_url=None, retry_after=30):
+        self.rules = rules
+        self.memory = MemoryStore()
+        self.redis = RedisStore(redis_url) if redis_url and redis is not None else None
+        self.retry_after = retry_after
+        self._redis_down_until = 0
+
+    def evaluate(self, seller_id, phone_number, amount, consume):
+        """Raise VelocityLimitExceeded if a rule is broken; with ``consume``, count the charge.
+
+        A counted charge returns a JSON-serialisable receipt for ``release``.
+        """
+        if not self.rules:
+            return None
+        now = time.time()
+        entries = list(_entries(self.rules, seller_id, phone_number, amount, now))
+
+        violated = None
+        store = "memory"
+        if self.redis is not None and now >= self._redis_down_until:
+            try:
+                violated = self.redis.evaluate(entries, consume, now)
+                store = "redis"
+            except redis.RedisError as exc:
+                # Skip Redis for a while instead of paying the timeout on every charge.
+                self._redis_down_until = now + self.retry_after
+                logger.warning("Velocity counters unavailable, using in-memory fallback: %s", exc)
+                violated = self.memory.evaluate(entries, consume, now)
+        else:
+            violated = self.memory.evaluate(entries, consume, now)
+
+        if violated is not None:
+            raise VelocityLimitExceeded(violated)
+        if consume:
+            return {"store": store, "counted": [[curr_key, cost] for _, curr_key, _, cost, _, _ in entries]}
+        return None
+
+    def release(self, receipt):
+        """Give back a charge counted by ``evaluate(consume=True)``, e.g. because it failed."""
+        if not receipt:
+            return
+        now = time.time()
+        if receipt["store"] == "redis" and self.redis is not None:
+            try:
+                self.redis.release(receipt["counted"], now)
+            except redis.RedisError as exc:
+                logger.warning("Could not release velocity counters: %s", exc)
+        elif receipt["store"] == "memory":
+            self.memory.release(receipt["counted"], now)
+
+
+_checker = None
+_checker_lock = threading.Lock()
+
+
+def get_checker():
+    global _checker
+    with _checker_lock:
+        if _checker is None:
+            rules = [Rule(**rule) for rule in getattr(settings, "VELOCITY_RULES", [])]
+            _checker = VelocityChecker(
+                rules,
+                redis_url=getattr(settings, "VELOCITY_REDIS_URL", None),
+                retry_after=getattr(settings, "VELOCITY_REDIS_RETRY_AFTER", 30),
+            )
+        return _checker
+
+
+def reset_checker():
+    """Drop the cached checker, e.g. after changing VELOCITY_RULES in tests."""
+    global _checker
+    with _checker_lock:
+        _checker = None
+
+
+def check(seller_id, phone_number, amount):
+    """Raise VelocityLimitExceeded if this charge would break a rule, without counting it."""
+    get_checker().evaluate(seller_id, phone_number, amount, consume=False)
+
+
+def hit(seller_id, phone_number, amount):
+    """Atomically check every rule and, if none is broken, count this charge.
+
+    Returns a receipt to pass to ``release`` if the charge does not go through.
+    """
+    return get_checker().evaluate(seller_id, phone_number, amount, consume=True)
+
+
+def release(receipt):
+    """Stop counting a charge that ``hit`` counted but that failed."""
+    get_checker().release(receipt)
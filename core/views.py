@@ -1,13 +1,25 @@
+import math
+
+from django.conf import settings
+from django.db import DatabaseError
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
+from django_filters.utils import translate_validation
 from rest_framework import viewsets, status
-from rest_framework.decorators import action, api_view
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
+from .filters import TransactionSearchFilter
 from .models import Seller, TopUpRequest, Transaction, sell_charge, InsufficientBalanceError, TopUpAlreadyAppliedError
-from .serializers import SellerSerializer, TopUpRequestSerializer, TransactionSerializer, SellChargeSerializer
+from .pagination import EstimatedCountPagination
+from .profiling import recent_profiles
+from .serializers import (
+    SellerSerializer, TopUpRequestSerializer, TransactionSerializer, SellChargeSerializer,
+    ChangeEventSerializer, FeedAckSerializer,
+)
 from .tasks import sell_charge_task
+from . import contention, feed, velocity
 
 # Seller CRUD
 class SellerViewSet(viewsets.ModelViewSet):
@@ -27,7 +39,18 @@ class TransactionViewSet(viewsets.ReadOnlyModelViewSet):
     pagination_class = TransactionPagination
 
     def get_queryset(self):
-        return Transaction.objects.all().order_by("-created_at")
+        return Transaction.objects.select_related("phone").order_by("-created_at")
+
+    @action(detail=False, methods=["get"], pagination_class=EstimatedCountPagination)
+    def search(self, request):
+        """Search by phone, date range, amount range and metadata (?metadata=order_id:X)."""
+        filterset = TransactionSearchFilter(request.query_params, queryset=self.get_queryset(), request=request)
+        if not filterset.is_valid():
+            raise translate_validation(filterset.errors)
+        queryset = filterset.qs
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
 
 # TopUpRequest
@@ -43,6 +66,17 @@ class TopUpRequestViewSet(viewsets.ModelViewSet):
             new_balance = topup.apply(approver=approver)
         except TopUpAlreadyAppliedError:
             return Response({"detail": "Already applied"}, status=status.HTTP_400_BAD_REQUEST)
+        except DatabaseError as exc:
+            kind = contention.classify(exc)
+            contention.record(kind, "topup_apply")
+            if kind not in contention.TRANSIENT:
+                raise
+            return Response(
+                {"detail": "Seller is busy, retry later", "reason": kind},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                # Spread retrying clients over 1-4 s (full jitter at attempt 3).
+                headers={"Retry-After": str(max(1, math.ceil(contention.backoff_delay(3))))},
+            )
 
         return Response({
             "status": "applied",
@@ -67,7 +101,72 @@ def sell_charge_api(request):
     if balance < amount:
         return Response({"detail": "Insufficient balance"}, status=400)
 
+    try:
+        velocity.check(seller_id, phone_number, amount)
+    except velocity.VelocityLimitExceeded as exc:
+        return Response({"detail": str(exc), "rule": exc.rule.name}, status=429)
+
     # Async execution with Celery
     task = sell_charge_task.delay(seller_id, phone_number, amount, reference, metadata)
 
     return Response({"status": "queued", "task_id": task.id}, status=202)
+
+
+# SQL profiles recorded by SQLProfilingMiddleware and the Celery hooks
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def sql_profiles_api(request):
+    profiles = recent_profiles()
+    label = request.query_params.get("label")
+    if label:
+        profiles = [p for p in profiles if p["label"] == label]
+    return Response({"count": len(profiles), "results": profiles[::-1]})
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def contention_stats_api(request):
+    return Response(contention.stats())
+
+
+# Ledger change feed
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def change_feed_api(request):
+    """Events after ``cursor`` (or the consumer's stored offset), long-polling up to ``wait`` seconds
+    (capped at CHANGE_FEED_MAX_WAIT)."""
+    try:
+        limit = min(int(request.query_params.get("limit", 500)), feed.MAX_BATCH)
+        wait = float(request.query_params.get("wait", 0))
+        if not math.isfinite(wait):
+            raise ValueError("wait must be a finite number of seconds")
+        # A waiting request holds a worker thread and a DB connection.
+        wait = min(wait, getattr(settings, "CHANGE_FEED_MAX_WAIT", 10))
+        if "cursor" in request.query_params:
+            after = feed.parse_cursor(request.query_params["cursor"])
+        elif "consumer" in request.query_params:
+            after = feed.consumer_cursor(request.query_params["consumer"])
+        else:
+            after = (0, 0)
+    except ValueError as exc:
+        return Response({"detail": str(exc)}, status=400)
+
+    events = feed.long_poll(after, limit=max(limit, 1), wait=max(wait, 0))
+    next_cursor = (events[-1].txid, events[-1].pk) if events else after
+    return Response({
+        "results": ChangeEventSerializer(events, many=True).data,
+        "next_cursor": feed.format_cursor(next_cursor),
+    })
+
+
+@api_view(["POST"])
+@permission_classes([IsAdminUser])
+def change_feed_ack_api(request):
+    serializer = FeedAckSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    try:
+        cursor = feed.parse_cursor(serializer.validated_data["cursor"])
+    except feed.InvalidCursor as exc:
+        return Response({"detail": str(exc)}, status=400)
+    stored = feed.ack(serializer.validated_data["consumer"], cursor)
+    return Response({"consumer": serializer.validated_data["consumer"], "cursor": feed.format_cursor(stored)})
@@ -43,6 +43,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.profiling.SQLProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -147,6 +148,17 @@ CELERY_TIMEZONE = 'Asia/Tehran'
 CELERY_TASK_ALWAYS_EAGER = True
 CELERY_TASK_EAGER_PROPAGATES = True
 
+CELERY_BEAT_SCHEDULE = {
+    "deliver-balance-alerts": {
+        "task": "core.tasks.deliver_balance_alerts_task",
+        "schedule": 30.0,
+    },
+    "prune-change-feed": {
+        "task": "core.tasks.prune_change_feed_task",
+        "schedule": 3600.0,
+    },
+}
+
 
 REST_FRAMEWORK = {
 "DEFAULT_AUTHENTICATION_CLASSES": (
@@ -170,4 +182,46 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
     "ROTATE_REFRESH_TOKENS": False,
     "BLACKLIST_AFTER_ROTATION": True,
-}
\ No newline at end of file
+}
+
+# Transaction ledger partitioning / archival
+TRANSACTION_PARTITION_MONTHS_AHEAD = 3
+# Also the idempotency window for Transaction.reference: archived months release their references.
+TRANSACTION_ARCHIVE_KEEP_MONTHS = 12
+TRANSACTION_ARCHIVE_DIR = BASE_DIR / "archive"
+
+# Monthly seller statements
+STATEMENTS_DIR = BASE_DIR / "statements"
+
+
+# Opt-in SQL profiling (per request and per Celery task); see core/profiling.py
+SQL_PROFILING_ENABLED = os.environ.get("SQL_PROFILING") == "1"
+SQL_PROFILING_BUFFER_SIZE = 200
+
+# Low balance alerts; sellers may override the threshold (IRR) individually
+LOW_BALANCE_THRESHOLD = None
+LOW_BALANCE_REARM_MARGIN = 0.1
+LOW_BALANCE_ALERT_COOLDOWN = timedelta(hours=1)
+BALANCE_ALERT_BACKEND = "core.alerts.log_alerts"
+
+# Velocity limits evaluated in sell_charge_api and sell_charge_task; see core/velocity.py
+VELOCITY_RULES = [
+    {"name": "phone-hourly", "scope": "phone", "window": 3600, "limit": 5},
+    {"name": "seller-hourly-amount", "scope": "seller", "window": 3600, "limit": 1000000000, "measure": "amount"},
+]
+VELOCITY_REDIS_URL = "redis://redis:6379/2"
+VELOCITY_REDIS_TIMEOUT = 0.05
+VELOCITY_REDIS_RETRY_AFTER = 30
+
+# Row lock contention policy; see core/contention.py
+LOCK_TIMEOUT_MS = 2000
+LOCK_NOWAIT = False
+CONTENTION_BACKOFF_BASE = 0.5
+CONTENTION_BACKOFF_CAP = 30
+
+# Ledger change feed; see core/feed.py
+CHANGE_FEED_POLL_INTERVAL = 1.0
+# Upper bound for the API's ?wait=; each waiting request occupies a gunicorn thread.
+CHANGE_FEED_MAX_WAIT = 10
+# Events older than this are pruned even if a consumer has not read them.
+CHANGE_FEED_RETENTION = timedelta(days=7)